@@ -3,10 +3,24 @@
 from __future__ import annotations
 
 import os
+import re
 import sys
+import threading
+import traceback
+import zlib
+from contextlib import ExitStack
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import wraps
 from pathlib import Path
+from typing import NamedTuple
 
-from flask import Flask, jsonify, redirect, render_template, request, session, url_for
+import brotli
+import orjson
+from cachetools import TTLCache
+from flask import Flask, g, jsonify, redirect, render_template, request, session, url_for
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 
 # Add project root to path
 project_root = Path(__file__).resolve().parent
@@ -15,44 +29,240 @@ if str(project_root) not in sys.path:
 
 from src import analytics, auth, chatbot, operations
 from src.auth import AuthenticationError, AuthorizationError, UserSession
+from src.db import db_cursor
+from src.logger import get_logger
+
+logger = get_logger("app")
+chatbot_logger = get_logger("chatbot")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson for request parsing and responses.
+
+    Types orjson does not handle natively (e.g. ``Decimal``) fall back to
+    Flask's default conversion, and MySQL ``TIME``/binary/``SET`` values to
+    their string form.
+    """
+
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        # Column types ad-hoc chatbot SQL can return that Flask does not handle
+        if isinstance(o, (timedelta, bytes, bytearray, set)):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+    def _options(self, **kwargs) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options(**kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._options(indent=indent) | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key-change-in-production")  # Use environment variable in production!
 
+# Compress JSON API responses (brotli when accepted, else gzip/deflate).
+# Flask-Compress would buffer streamed bodies, so those are compressed chunk by
+# chunk in _stream_rows_response instead.
+app.config.update(
+    COMPRESS_MIMETYPES=["application/json"],
+    COMPRESS_LEVEL=4,
+    COMPRESS_MIN_SIZE=1024,
+    COMPRESS_STREAMS=False,
+)
+Compress(app)
+
+
+# Fallback extraction of a SELECT statement from a malformed chatbot response
+_SQL_EXTRACT_RE = re.compile(r"SELECT.*?;", re.IGNORECASE | re.DOTALL)
+
+
+# Upper bound for the ?limit= page size of GET /api/transactions
+_MAX_TRANSACTIONS_PAGE = 500
+
+# Hot GET /api/transactions statement, run as a server-side prepared statement
+_TRANSACTIONS_PAGE_SQL = """
+    SELECT t.transid, t.categoryid, t.amount, t.type, t.date, t.paymentmethod,
+           c.name as category_name
+    FROM transaction t
+    JOIN category c ON t.categoryid = c.categoryid
+    WHERE t.userid = %s
+    ORDER BY t.date DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def _transaction_row(row: tuple) -> dict:
+    """Build the JSON object for a ``_TRANSACTIONS_PAGE_SQL`` row."""
+    transid, categoryid, amount, trans_type, trans_date, paymentmethod, category_name = row
+    return {
+        "transid": transid,
+        "categoryid": categoryid,
+        "amount": amount,
+        "type": trans_type,
+        "date": trans_date,
+        "paymentmethod": paymentmethod,
+        "category_name": category_name,
+    }
+
+
+_BUDGETS_SQL = """
+    SELECT b.budgetid, b.userid, b.categoryid, b.limitamount, b.month, b.status,
+           c.name as category_name
+    FROM budget b
+    JOIN category c ON b.categoryid = c.categoryid
+    WHERE b.userid = %s
+    ORDER BY b.month DESC, b.budgetid DESC
+"""
+
+
+def _budget_row(row: tuple) -> dict:
+    """Build the JSON object for a ``_BUDGETS_SQL`` row."""
+    budgetid, userid, categoryid, limitamount, month, status, category_name = row
+    return {
+        "budgetid": budgetid,
+        "userid": userid,
+        "categoryid": categoryid,
+        "limitamount": limitamount,
+        "month": month,
+        "status": status,
+        "category_name": category_name,
+    }
+
+# Rows fetched and encoded per chunk for streamed JSON list responses
+_STREAM_BATCH_SIZE = 500
+
+# ==================== Analytics Queries ====================
+
+# Date filter per supported analytics period
+_DATE_FILTERS = {
+    "current_month": "MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE())",
+    "last_3_months": "date >= DATE_SUB(CURDATE(), INTERVAL 3 MONTH)",
+    "last_6_months": "date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)",
+    "last_year": "date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)",
+    "all_time": "1=1",  # No date filter
+}
+
+# Months of monthly trend history per period (None = all months)
+_INTERVAL_MAP = {
+    "last_3_months": 3,
+    "last_6_months": 6,
+    "last_year": 12,
+    "all_time": None,
+}
+
+
+class _AnalyticsQueries(NamedTuple):
+    """Fully specialized analytics summary SQL for one period."""
+
+    totals_sql: str
+    top_categories_sql: str
+    trend_sql: str
+    all_categories_sql: str
+    trend_key: str
+
+
+def _build_analytics_queries(period: str) -> _AnalyticsQueries:
+    """Build the analytics summary queries for a period with its filters inlined."""
+    date_filter = _DATE_FILTERS[period]
+
+    totals_sql = f"""
+        SELECT 
+            type,
+            SUM(amount) as total
+        FROM transaction
+        WHERE userid = %s
+          AND {date_filter}
+        GROUP BY type
+    """
+
+    all_categories_sql = f"""
+        SELECT c.name, SUM(t.amount) as total
+        FROM transaction t
+        JOIN category c ON t.categoryid = c.categoryid
+        WHERE t.userid = %s
+          AND t.type = 'expense'
+          AND {date_filter}
+        GROUP BY c.categoryid, c.name
+        ORDER BY total DESC
+    """
+    top_categories_sql = all_categories_sql + "    LIMIT 3\n"
+
+    # Income and expense are pivoted into columns by the database, one row per
+    # day (current month) or month (other periods)
+    if period == "current_month":
+        trend_label, trend_format, trend_key = "day", "%Y-%m-%d", "days"
+        trend_filter = f"AND {date_filter}"
+    else:
+        interval = _INTERVAL_MAP[period]
+        trend_label, trend_format, trend_key = "month", "%Y-%m", "months"
+        trend_filter = f"AND date >= DATE_SUB(CURDATE(), INTERVAL {interval} MONTH)" if interval else ""
+    trend_sql = f"""
+        SELECT 
+            DATE_FORMAT(date, '{trend_format}') as {trend_label},
+            SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) as income,
+            SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) as expense
+        FROM transaction
+        WHERE userid = %s
+          {trend_filter}
+        GROUP BY {trend_label}
+        ORDER BY {trend_label} ASC
+    """
+
+    return _AnalyticsQueries(totals_sql, top_categories_sql, trend_sql, all_categories_sql, trend_key)
+
+
+# Built once at startup so each period always sends identical SQL text
+_ANALYTICS_QUERIES = {period: _build_analytics_queries(period) for period in _DATE_FILTERS}
+
 
 def get_current_user() -> UserSession | None:
-    """Get current user from session."""
+    """Get current user from session, built at most once per request."""
+    user = getattr(g, "_cached_user", None)
+    if user is not None:
+        return user
     if "user" in session:
-        return UserSession(**session["user"])
+        user = g._cached_user = UserSession(**session["user"])
+        return user
     return None
 
 
-def require_login(f):
-    """Decorator to require login."""
-    from functools import wraps
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not get_current_user():
-            return redirect(url_for("login"))
-        return f(*args, **kwargs)
+def require_auth(role: str | None = None):
+    """Decorator to require login and, optionally, a specific role.
 
-    return decorated_function
-
-
-def require_role(required_role: str):
-    """Decorator to require specific role."""
+    The authenticated user is stored on ``g.current_user`` for the view.
+    """
 
     def decorator(f):
-        from functools import wraps
-
         @wraps(f)
         def decorated_function(*args, **kwargs):
             user = get_current_user()
             if not user:
                 return redirect(url_for("login"))
-            if user.role != required_role:
+            if role is not None and user.role != role:
                 return jsonify({"error": "Access denied"}), 403
+            g.current_user = user
             return f(*args, **kwargs)
 
         return decorated_function
@@ -60,6 +270,38 @@ def require_role(required_role: str):
     return decorator
 
 
+require_login = require_auth()
+
+
+def _to_decimal(value) -> Decimal:
+    """Convert a JSON number or numeric string to ``Decimal``.
+
+    Strings and ints convert exactly as-is; floats go through their shortest
+    ``repr`` so e.g. ``0.1`` becomes ``Decimal("0.1")``.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (str, int)):
+        return Decimal(value)
+    return Decimal(repr(value))
+
+
+def _optional_id(value) -> int | None:
+    """Return an optional id field as an int, or None when it is empty.
+
+    Raises:
+        ValueError: The value is neither an int nor a string of ASCII digits.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    # bool is an int subclass, but true/false is not an id
+    if type(value) is int:
+        return value or None
+    raise ValueError(f"expected an integer id, got {value!r}")
+
+
 # ==================== Routes ====================
 
 
@@ -69,8 +311,8 @@ def index():
     user = get_current_user()
     if user:
         if user.role == "admin":
-            return redirect(url_for("admin_dashboard"))
-        return redirect(url_for("user_dashboard"))
+            return redirect(url_for("admin_page", page="dashboard"))
+        return redirect(url_for("user_page", page="dashboard"))
     return redirect(url_for("login"))
 
 
@@ -93,8 +335,8 @@ def login():
                 "role": user_session.role,
             }
             if user_session.role == "admin":
-                return redirect(url_for("admin_dashboard"))
-            return redirect(url_for("user_dashboard"))
+                return redirect(url_for("admin_page", page="dashboard"))
+            return redirect(url_for("user_page", page="dashboard"))
         else:
             return render_template("login.html", error="Invalid email or password")
 
@@ -132,109 +374,92 @@ def register():
 # ==================== User Routes ====================
 
 
-@app.route("/user/dashboard")
+@app.route("/user/<any(dashboard,transactions,budgets,analytics,chatbot,reports,alerts):page>")
 @require_login
-def user_dashboard():
-    """User dashboard."""
-    user = get_current_user()
-    return render_template("user/dashboard.html", user=user)
-
-
-@app.route("/user/transactions")
-@require_login
-def user_transactions():
-    """User transactions page."""
-    user = get_current_user()
-    return render_template("user/transactions.html", user=user)
-
-
-@app.route("/user/budgets")
-@require_login
-def user_budgets():
-    """User budgets page."""
-    user = get_current_user()
-    return render_template("user/budgets.html", user=user)
-
-
-@app.route("/user/analytics")
-@require_login
-def user_analytics():
-    """User analytics page."""
-    user = get_current_user()
-    return render_template("user/analytics.html", user=user)
-
-
-@app.route("/user/chatbot")
-@require_login
-def user_chatbot():
-    """User chatbot page."""
-    user = get_current_user()
-    return render_template("user/chatbot.html", user=user)
-
-
-@app.route("/user/reports")
-@require_login
-def user_reports():
-    """User reports page."""
-    user = get_current_user()
-    return render_template("user/reports.html", user=user)
-
-
-@app.route("/user/alerts")
-@require_login
-def user_alerts():
-    """User alerts page."""
-    user = get_current_user()
-    return render_template("user/alerts.html", user=user)
+def user_page(page: str):
+    """Render a user page (dashboard, transactions, budgets, ...)."""
+    return render_template(f"user/{page}.html", user=g.current_user)
 
 
 # ==================== Admin Routes ====================
 
 
-@app.route("/admin/dashboard")
-@require_login
-@require_role("admin")
-def admin_dashboard():
-    """Admin dashboard."""
-    user = get_current_user()
-    return render_template("admin/dashboard.html", user=user)
+@app.route("/admin/<any(dashboard,users,transactions,categories):page>")
+@require_auth("admin")
+def admin_page(page: str):
+    """Render an admin page (dashboard, users, transactions, categories)."""
+    return render_template(f"admin/{page}.html", user=g.current_user)
 
 
-@app.route("/admin/users")
-@require_login
-@require_role("admin")
-def admin_users():
-    """Admin user management page."""
-    user = get_current_user()
-    return render_template("admin/users.html", user=user)
-
-
-@app.route("/admin/transactions")
-@require_login
-@require_role("admin")
-def admin_transactions():
-    """Admin transactions management page."""
-    user = get_current_user()
-    return render_template("admin/transactions.html", user=user)
-
-
-@app.route("/admin/categories")
-@require_login
-@require_role("admin")
-def admin_categories():
-    """Admin categories management page."""
-    user = get_current_user()
-    return render_template("admin/categories.html", user=user)
+# ==================== API Routes ====================
 
 
-# ==================== API Routes ====================
+def _etag_matches(etag: str) -> bool:
+    """Return whether the request's If-None-Match holds ``etag`` (weak comparison, or ``*``)."""
+    return request.if_none_match.contains_weak(etag)
+
+
+def _iter_json_rows(cursor, key: str, make_row):
+    """Yield a ``{"success": true, <key>: [...]}`` JSON body from an executed cursor.
+
+    Rows are pulled with ``fetchmany`` and encoded one batch at a time, so the
+    full result set is never held in memory. ``make_row`` builds the object for
+    a row of the query's known column layout.
+    """
+    default = app.json.default
+    yield b'{"success":true,"' + key.encode() + b'":['
+    separator = b""
+    while True:
+        batch = cursor.fetchmany(_STREAM_BATCH_SIZE)
+        if not batch:
+            break
+        # Encode the whole batch as one array and drop its brackets
+        yield separator + orjson.dumps([make_row(row) for row in batch], default=default)[1:-1]
+        separator = b","
+    yield b"]}\n"
+
+
+def _iter_compressed(chunks, encoding: str):
+    """Compress ``chunks`` with ``encoding``, flushing after each chunk so output keeps streaming."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=app.config["COMPRESS_BR_LEVEL"])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        # wbits 16 + MAX_WBITS selects the gzip container
+        compressor = zlib.compressobj(
+            app.config["COMPRESS_LEVEL"], zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def _stream_rows_response(resources: ExitStack, cursor, key: str, make_row):
+    """Return a response streaming the cursor's rows as JSON under ``key``.
+
+    The body is brotli or gzip compressed as it is produced when the client
+    accepts it. ``resources`` owns the cursor's connection and is closed with
+    the response.
+    """
+    body = _iter_json_rows(cursor, key, make_row)
+    encoding = request.accept_encodings.best_match(["br", "gzip"])
+    if encoding:
+        body = _iter_compressed(body, encoding)
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.call_on_close(resources.close)
+    return response
 
 
 @app.route("/api/transactions", methods=["GET", "POST"])
 @require_login
 def api_transactions():
     """API for transactions."""
-    user = get_current_user()
+    user = g.current_user
     if request.method == "POST":
         data = request.get_json()
         if not data:
@@ -247,26 +472,20 @@ def api_transactions():
             return jsonify({"success": False, "error": f"Missing required fields: {', '.join(missing_fields)}"}), 400
         
         try:
-            from datetime import date
-            from decimal import Decimal
-
-            # Convert paymentmethod to int or None
-            paymentmethod = None
-            if data.get("paymentmethod"):
-                try:
-                    paymentmethod = int(data["paymentmethod"])
-                except (ValueError, TypeError):
-                    paymentmethod = None
-
-            trans_id = operations.record_transaction(
+            trans_id, budget_status, alerts = operations.record_transaction_with_status(
                 userid=user.userid if user.role == "user" else data.get("userid", user.userid),
                 categoryid=int(data["categoryid"]),
-                amount=Decimal(str(data["amount"])),
+                amount=_to_decimal(data["amount"]),
                 trans_type=data["type"],
                 transaction_date=date.fromisoformat(data["date"]),
-                paymentmethod=paymentmethod,
+                paymentmethod=_optional_id(data.get("paymentmethod")),
             )
-            return jsonify({"success": True, "trans_id": trans_id})
+            return jsonify({
+                "success": True,
+                "trans_id": trans_id,
+                "budget_status": budget_status,
+                "alerts": alerts,
+            })
         except ValueError as e:
             return jsonify({"success": False, "error": f"Invalid data format: {str(e)}"}), 400
         except KeyError as e:
@@ -283,22 +502,34 @@ def api_transactions():
                     "error": "Invalid category or payment method selected. Please check your selections."
                 }), 400
             # Generic error
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"Transaction API Error: {error_details}")  # Log to console for debugging
+            logger.exception("Transaction API error for user %s", user.userid)
             return jsonify({"success": False, "error": f"Error adding transaction: {error_msg}"}), 500
 
-    # GET - return user's transactions
+    # GET - return a page of the user's transactions
+    limit = min(max(request.args.get("limit", 100, type=int), 1), _MAX_TRANSACTIONS_PAGE)
+    offset = max(request.args.get("offset", 0, type=int), 0)
     try:
-        from src.db import db_cursor
-
-        query = "SELECT t.*, c.name as category_name FROM transaction t JOIN category c ON t.categoryid = c.categoryid WHERE t.userid = %s ORDER BY t.date DESC LIMIT 100"
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            transactions = [dict(zip(columns, row)) for row in rows]
-        return jsonify({"success": True, "transactions": transactions})
+        resources = ExitStack()
+        _, cursor = resources.enter_context(db_cursor(prepared=True))
+        try:
+            # The user's transaction version changes on every insert, update and delete,
+            # so unchanged pages can be answered with 304 without fetching any rows.
+            version = operations.fetch_transaction_version(cursor, user.userid)
+            etag = f"{user.userid}-{version}-{limit}-{offset}"
+            if _etag_matches(etag):
+                resources.close()
+                response = app.response_class(status=304)
+            else:
+                cursor.execute(_TRANSACTIONS_PAGE_SQL, (user.userid, limit, offset))
+                response = _stream_rows_response(resources, cursor, "transactions", _transaction_row)
+        except Exception:
+            resources.close()
+            raise
+        # Weak: the same listing is served identity, brotli or gzip encoded
+        response.set_etag(etag, weak=True)
+        response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -307,13 +538,10 @@ def api_transactions():
 @require_login
 def api_budgets():
     """API for budgets."""
-    user = get_current_user()
+    user = g.current_user
     if request.method == "POST":
         data = request.get_json()
         try:
-            from decimal import Decimal
-            from src.db import db_cursor
-
             query = """
                 INSERT INTO budget (userid, categoryid, limitamount, month, status)
                 VALUES (%s, %s, %s, %s, %s)
@@ -324,7 +552,7 @@ def api_budgets():
                     (
                         user.userid if user.role == "user" else data.get("userid", user.userid),
                         int(data["categoryid"]),
-                        Decimal(str(data["limitamount"])),
+                        _to_decimal(data["limitamount"]),
                         int(data["month"]),
                         data.get("status", "active"),
                     ),
@@ -335,23 +563,38 @@ def api_budgets():
 
     # GET
     try:
-        from src.db import db_cursor
-
-        query = """
-            SELECT b.*, c.name as category_name 
-            FROM budget b 
-            JOIN category c ON b.categoryid = c.categoryid 
-            WHERE b.userid = %s 
-            ORDER BY b.month DESC, b.budgetid DESC
-        """
+        resources = ExitStack()
+        _, cursor = resources.enter_context(db_cursor())
+        try:
+            cursor.execute(_BUDGETS_SQL, (user.userid,))
+        except Exception:
+            resources.close()
+            raise
+        return _stream_rows_response(resources, cursor, "budgets", _budget_row)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Categories and payment methods change rarely; keep their serialized
+# listings in memory for a short time instead of querying on every page load.
+_REFERENCE_CACHE = TTLCache(maxsize=2, ttl=60)
+_REFERENCE_CACHE_LOCK = threading.Lock()
+
+
+def _reference_table_response(key: str, query: str):
+    """Return a JSON response listing a reference table under ``key``, cached with a TTL."""
+    with _REFERENCE_CACHE_LOCK:
+        body = _REFERENCE_CACHE.get(key)
+    if body is None:
         with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
+            cursor.execute(query)
             columns = [desc[0] for desc in cursor.description]
             rows = cursor.fetchall()
-            budgets = [dict(zip(columns, row)) for row in rows]
-        return jsonify({"success": True, "budgets": budgets})
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+            items = [dict(zip(columns, row)) for row in rows]
+        body = app.json.dumps({"success": True, key: items})
+        with _REFERENCE_CACHE_LOCK:
+            _REFERENCE_CACHE[key] = body
+    return app.response_class(body, mimetype=app.json.mimetype)
 
 
 @app.route("/api/categories", methods=["GET"])
@@ -359,15 +602,7 @@ def api_budgets():
 def api_categories():
     """API for categories."""
     try:
-        from src.db import db_cursor
-
-        query = "SELECT * FROM category ORDER BY name"
-        with db_cursor() as (_, cursor):
-            cursor.execute(query)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            categories = [dict(zip(columns, row)) for row in rows]
-        return jsonify({"success": True, "categories": categories})
+        return _reference_table_response("categories", "SELECT * FROM category ORDER BY name")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -377,15 +612,7 @@ def api_categories():
 def api_payment_methods():
     """API for payment methods."""
     try:
-        from src.db import db_cursor
-
-        query = "SELECT * FROM paymentmethod ORDER BY type"
-        with db_cursor() as (_, cursor):
-            cursor.execute(query)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            methods = [dict(zip(columns, row)) for row in rows]
-        return jsonify({"success": True, "payment_methods": methods})
+        return _reference_table_response("payment_methods", "SELECT * FROM paymentmethod ORDER BY type")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -394,21 +621,35 @@ def api_payment_methods():
 @require_login
 def api_alerts():
     """API for user alerts."""
-    user = get_current_user()
+    user = g.current_user
+    unread_only = request.args.get("unread_only", "").lower() in ("1", "true")
+    limit = request.args.get("limit", 100, type=int)
     try:
-        alerts = operations.get_user_alerts(user.userid, unread_only=False)
+        alerts = operations.get_user_alerts(user.userid, unread_only=unread_only, limit=limit)
         return jsonify({"success": True, "alerts": alerts})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/api/alerts/unread_count", methods=["GET"])
+@require_login
+def api_alerts_unread_count():
+    """API for the number of unread alerts."""
+    user = g.current_user
+    try:
+        count = operations.count_unread_alerts(user.userid)
+        return jsonify({"success": True, "count": count})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route("/api/chatbot/query", methods=["POST"])
 @require_login
 def api_chatbot_query():
     """API for chatbot queries with user context."""
     data = request.get_json()
     user_message = data.get("message", "").strip()
-    user = get_current_user()
+    user = g.current_user
 
     if not user_message:
         return jsonify({"success": False, "error": "Message is required"}), 400
@@ -421,8 +662,7 @@ def api_chatbot_query():
 
         if not parsed:
             # Try to extract SQL even if format is slightly off
-            import re
-            sql_match = re.search(r'SELECT.*?;', raw_response, re.IGNORECASE | re.DOTALL)
+            sql_match = _SQL_EXTRACT_RE.search(raw_response)
             if sql_match:
                 parsed_sql = sql_match.group(0).strip()
                 # Ensure userid filter is added
@@ -453,41 +693,25 @@ def api_chatbot_query():
 
         rows, columns = chatbot.execute_sql(parsed.sql)
         
-        # Format results better
-        formatted_rows = []
-        if rows:
-            for row in rows:
-                formatted_row = []
-                for item in row:
-                    if isinstance(item, (int, float)):
-                        if isinstance(item, float):
-                            formatted_row.append(f"{item:.2f}")
-                        else:
-                            formatted_row.append(str(item))
-                    elif hasattr(item, 'isoformat'):  # datetime/date
-                        formatted_row.append(item.isoformat())
-                    else:
-                        formatted_row.append(str(item) if item is not None else "")
-                formatted_rows.append(formatted_row)
+        # Cells are returned typed; the JSON provider serializes them and the
+        # chatbot page applies display formatting
+        rows = rows or []
 
         return jsonify(
             {
                 "success": True,
                 "sql": parsed.sql,
                 "explanation": parsed.explanation,
-                "rows": formatted_rows,
+                "rows": rows,
                 "columns": columns if columns else [],
-                "row_count": len(formatted_rows) if formatted_rows else 0,
+                "row_count": len(rows),
             }
         )
     except ValueError as e:
         # Security error
         return jsonify({"success": False, "error": str(e)}), 403
     except Exception as e:
-        import traceback
-        from src.logger import get_logger
-        logger = get_logger("chatbot")
-        logger.error(f"Chatbot error: {e}\n{traceback.format_exc()}")
+        chatbot_logger.error(f"Chatbot error: {e}\n{traceback.format_exc()}")
         return jsonify({"success": False, "error": f"Error processing query: {str(e)}"}), 500
 
 
@@ -495,139 +719,38 @@ def api_chatbot_query():
 @require_login
 def api_analytics_summary():
     """API for analytics summary with time period support."""
-    user = get_current_user()
+    user = g.current_user
     try:
-        from src.db import db_cursor
-        from datetime import datetime
-
         # Get time period from query parameter
         period = request.args.get("period", "last_6_months")
-        
-        # Build date filter based on period
-        date_filters = {
-            "current_month": "MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE())",
-            "last_3_months": "date >= DATE_SUB(CURDATE(), INTERVAL 3 MONTH)",
-            "last_6_months": "date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)",
-            "last_year": "date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)",
-            "all_time": "1=1"  # No date filter
-        }
-        date_filter = date_filters.get(period, date_filters["last_6_months"])
-
-        # Get totals for the selected period
-        query = f"""
-            SELECT 
-                type,
-                SUM(amount) as total
-            FROM transaction
-            WHERE userid = %s
-              AND {date_filter}
-            GROUP BY type
-        """
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
-            totals = {row[0]: float(row[1]) for row in cursor.fetchall()}
+        queries = _ANALYTICS_QUERIES.get(period, _ANALYTICS_QUERIES["last_6_months"])
+        trend_key = queries.trend_key
 
-        income = totals.get("income", 0.0)
-        expenses = totals.get("expense", 0.0)
-        savings = income - expenses
+        monthly_trends = {"income": [], "expense": [], trend_key: []}
+        with db_cursor(prepared=True) as (_, cursor):
+            # Get totals for the selected period
+            cursor.execute(queries.totals_sql, (user.userid,))
+            totals = {row[0]: float(row[1]) for row in cursor.fetchall()}
 
-        # Top categories for the selected period
-        query = f"""
-            SELECT c.name, SUM(t.amount) as total
-            FROM transaction t
-            JOIN category c ON t.categoryid = c.categoryid
-            WHERE t.userid = %s
-              AND t.type = 'expense'
-              AND {date_filter}
-            GROUP BY c.categoryid, c.name
-            ORDER BY total DESC
-            LIMIT 3
-        """
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
+            # Top categories for the selected period
+            cursor.execute(queries.top_categories_sql, (user.userid,))
             top_categories = [{"category": row[0], "amount": float(row[1])} for row in cursor.fetchall()]
 
-        # Monthly trend data - adjust based on period
-        if period == "current_month":
-            # For current month, show daily breakdown
-            query = f"""
-                SELECT 
-                    DATE_FORMAT(date, '%Y-%m-%d') as day,
-                    type,
-                    SUM(amount) as total
-                FROM transaction
-                WHERE userid = %s
-                  AND {date_filter}
-                GROUP BY day, type
-                ORDER BY day ASC
-            """
-            trend_key = "days"
-        else:
-            # For other periods, show monthly breakdown
-            interval_map = {
-                "last_3_months": 3,
-                "last_6_months": 6,
-                "last_year": 12,
-                "all_time": None
-            }
-            interval = interval_map.get(period, 6)
-            
-            if interval:
-                query = f"""
-                    SELECT 
-                        DATE_FORMAT(date, '%Y-%m') as month,
-                        type,
-                        SUM(amount) as total
-                    FROM transaction
-                    WHERE userid = %s
-                      AND date >= DATE_SUB(CURDATE(), INTERVAL {interval} MONTH)
-                    GROUP BY month, type
-                    ORDER BY month ASC
-                """
-            else:
-                # All time - show all months
-                query = """
-                    SELECT 
-                        DATE_FORMAT(date, '%Y-%m') as month,
-                        type,
-                        SUM(amount) as total
-                    FROM transaction
-                    WHERE userid = %s
-                    GROUP BY month, type
-                    ORDER BY month ASC
-                """
-            trend_key = "months"
-        
-        monthly_trends = {"income": [], "expense": [], trend_key: []}
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
-            rows = cursor.fetchall()
-            period_data = {}
-            for period_val, trans_type, total in rows:
-                if period_val not in period_data:
-                    period_data[period_val] = {"income": 0.0, "expense": 0.0}
-                period_data[period_val][trans_type] = float(total)
-            
-            for period_val in sorted(period_data.keys()):
+            # Trend data - one (period, income, expense) row per day or month
+            cursor.execute(queries.trend_sql, (user.userid,))
+            for period_val, income_total, expense_total in cursor.fetchall():
                 monthly_trends[trend_key].append(period_val)
-                monthly_trends["income"].append(period_data[period_val]["income"])
-                monthly_trends["expense"].append(period_data[period_val]["expense"])
-
-        # Category-wise spending for the selected period
-        query = f"""
-            SELECT c.name, SUM(t.amount) as total
-            FROM transaction t
-            JOIN category c ON t.categoryid = c.categoryid
-            WHERE t.userid = %s
-              AND t.type = 'expense'
-              AND {date_filter}
-            GROUP BY c.categoryid, c.name
-            ORDER BY total DESC
-        """
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (user.userid,))
+                monthly_trends["income"].append(float(income_total))
+                monthly_trends["expense"].append(float(expense_total))
+
+            # Category-wise spending for the selected period
+            cursor.execute(queries.all_categories_sql, (user.userid,))
             all_categories = [{"category": row[0], "amount": float(row[1])} for row in cursor.fetchall()]
 
+        income = totals.get("income", 0.0)
+        expenses = totals.get("expense", 0.0)
+        savings = income - expenses
+
         return jsonify(
             {
                 "success": True,
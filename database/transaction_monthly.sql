@@ -0,0 +1,86 @@
+-- Migration: monthly expense totals per category for analytics
+-- Creates the transaction_monthly summary table, rebuilds it from transaction
+-- and installs the triggers that keep it current. Analytics reads this table,
+-- so run this file once on every install (new or existing):
+--   mysql -u root -p expense_tracker < database/transaction_monthly.sql
+-- It is safe to run again; each run recomputes the totals from scratch.
+
+USE expense_tracker;
+
+-- Monthly expense totals per category, maintained by the triggers below so
+-- analytics reads O(months x categories) rows instead of scanning transaction
+CREATE TABLE IF NOT EXISTS transaction_monthly (
+    month CHAR(7) NOT NULL,
+    categoryid INT NOT NULL,
+    total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    transaction_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, categoryid),
+    CONSTRAINT fk_monthly_category FOREIGN KEY (categoryid) REFERENCES category(categoryid) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Stop maintaining the totals while they are rebuilt
+DROP TRIGGER IF EXISTS transaction_monthly_after_insert;
+DROP TRIGGER IF EXISTS transaction_monthly_after_update;
+DROP TRIGGER IF EXISTS transaction_monthly_after_delete;
+DROP PROCEDURE IF EXISTS apply_transaction_monthly;
+
+-- Rebuild from existing transactions
+DELETE FROM transaction_monthly;
+INSERT INTO transaction_monthly (month, categoryid, total, transaction_count)
+SELECT DATE_FORMAT(date, '%Y-%m') AS month,
+       categoryid,
+       COALESCE(SUM(amount), 0) AS total,
+       COUNT(*) AS transaction_count
+FROM transaction
+WHERE type = 'expense' AND categoryid IS NOT NULL AND date IS NOT NULL
+GROUP BY month, categoryid;
+
+DELIMITER $$
+
+-- Procedure: Add (p_sign = 1) or remove (p_sign = -1) one transaction from the monthly totals
+CREATE PROCEDURE apply_transaction_monthly(
+    IN p_type VARCHAR(10),
+    IN p_categoryid INT,
+    IN p_date DATE,
+    IN p_amount DECIMAL(10,2),
+    IN p_sign INT
+)
+BEGIN
+    IF p_type = 'expense' AND p_categoryid IS NOT NULL AND p_date IS NOT NULL THEN
+        INSERT INTO transaction_monthly (month, categoryid, total, transaction_count)
+        VALUES (DATE_FORMAT(p_date, '%Y-%m'), p_categoryid, p_sign * COALESCE(p_amount, 0), p_sign)
+        ON DUPLICATE KEY UPDATE
+            total = total + p_sign * COALESCE(p_amount, 0),
+            transaction_count = transaction_count + p_sign;
+
+        -- Drop buckets whose last transaction was removed
+        DELETE FROM transaction_monthly
+        WHERE month = DATE_FORMAT(p_date, '%Y-%m')
+          AND categoryid = p_categoryid
+          AND transaction_count <= 0;
+    END IF;
+END$$
+
+CREATE TRIGGER transaction_monthly_after_insert
+AFTER INSERT ON transaction
+FOR EACH ROW
+BEGIN
+    CALL apply_transaction_monthly(NEW.type, NEW.categoryid, NEW.date, NEW.amount, 1);
+END$$
+
+CREATE TRIGGER transaction_monthly_after_update
+AFTER UPDATE ON transaction
+FOR EACH ROW
+BEGIN
+    CALL apply_transaction_monthly(OLD.type, OLD.categoryid, OLD.date, OLD.amount, -1);
+    CALL apply_transaction_monthly(NEW.type, NEW.categoryid, NEW.date, NEW.amount, 1);
+END$$
+
+CREATE TRIGGER transaction_monthly_after_delete
+AFTER DELETE ON transaction
+FOR EACH ROW
+BEGIN
+    CALL apply_transaction_monthly(OLD.type, OLD.categoryid, OLD.date, OLD.amount, -1);
+END$$
+
+DELIMITER ;
@@ -0,0 +1,61 @@
+-- Migration: per-user transaction version counter
+-- Every insert, update or delete of a user's transactions bumps that user's
+-- version, so the app can tell whether cached summaries and listings are
+-- still current with a single primary-key lookup. Run this file once on every
+-- install (new or existing):
+--   mysql -u root -p expense_tracker < database/transaction_version.sql
+-- It is safe to run again.
+
+USE expense_tracker;
+
+CREATE TABLE IF NOT EXISTS transaction_version (
+    userid INT NOT NULL,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (userid),
+    CONSTRAINT fk_version_user FOREIGN KEY (userid) REFERENCES user(userid) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TRIGGER IF EXISTS transaction_version_after_insert;
+DROP TRIGGER IF EXISTS transaction_version_after_update;
+DROP TRIGGER IF EXISTS transaction_version_after_delete;
+DROP PROCEDURE IF EXISTS bump_transaction_version;
+
+DELIMITER $$
+
+-- Procedure: Advance a user's transaction version
+CREATE PROCEDURE bump_transaction_version(
+    IN p_userid INT
+)
+BEGIN
+    IF p_userid IS NOT NULL THEN
+        INSERT INTO transaction_version (userid, version)
+        VALUES (p_userid, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER transaction_version_after_insert
+AFTER INSERT ON transaction
+FOR EACH ROW
+BEGIN
+    CALL bump_transaction_version(NEW.userid);
+END$$
+
+CREATE TRIGGER transaction_version_after_update
+AFTER UPDATE ON transaction
+FOR EACH ROW
+BEGIN
+    CALL bump_transaction_version(NEW.userid);
+    IF NOT (OLD.userid <=> NEW.userid) THEN
+        CALL bump_transaction_version(OLD.userid);
+    END IF;
+END$$
+
+CREATE TRIGGER transaction_version_after_delete
+AFTER DELETE ON transaction
+FOR EACH ROW
+BEGIN
+    CALL bump_transaction_version(OLD.userid);
+END$$
+
+DELIMITER ;
@@ -15,10 +15,10 @@ def run_chatbot() -> None:
 
 def run_analytics() -> None:
     rows = analytics.fetch_historic_data()
-    data, months, categories = analytics.process_data(rows)
-    fig1 = analytics.plot_monthly_spendings(data, months, categories)
+    monthly = analytics.process_data(rows)
+    fig1 = analytics.plot_monthly_spendings(monthly)
     fig1.show()
-    fig2 = analytics.plot_category_spendings_overall(data)
+    fig2 = analytics.plot_category_spendings_overall(monthly)
     fig2.show()
 
     df = analytics.fetch_dataframe()
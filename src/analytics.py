@@ -2,59 +2,53 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, List
 
 import matplotlib.pyplot as plt
-import mysql.connector
 import numpy as np
 import pandas as pd
 from matplotlib.figure import Figure
-from sklearn.linear_model import LinearRegression
 
-from .db import db_cursor, get_connection
+from .db import db_cursor
 
 
-def fetch_historic_data() -> List[Tuple[str, str, float]]:
-    """Return total monthly spendings by category."""
+def fetch_historic_data() -> np.ndarray:
+    """Return total monthly spendings by category.
+
+    The result is a structured array with ``month``, ``category`` and
+    ``total_spent`` fields, stored packed rather than as per-row tuples.
+    """
     query = """
-        SELECT DATE_FORMAT(t.date, '%Y-%m') AS month,
+        SELECT tm.month,
                c.name AS category,
-               SUM(t.amount) AS total_spent
-        FROM transaction t
-        JOIN category c ON t.categoryid = c.categoryid
-        WHERE t.type = 'expense'
-        GROUP BY month, category
-        ORDER BY month ASC, category ASC
+               SUM(tm.total) AS total_spent
+        FROM transaction_monthly tm
+        JOIN category c ON tm.categoryid = c.categoryid
+        GROUP BY tm.month, category
+        ORDER BY tm.month ASC, category ASC
     """
 
     with db_cursor() as (_, cursor):
         cursor.execute(query)
         rows = cursor.fetchall()
-    return [(month, category, float(total)) for month, category, total in rows]
+    # Size the category field to the longest name so nothing is truncated or padded out
+    width = max((len(category) for _, category, _ in rows), default=1)
+    dtype = [("month", "U7"), ("category", f"U{width}"), ("total_spent", "f8")]
+    return np.array(rows, dtype=dtype)
 
 
-def process_data(rows: Iterable[Tuple[str, str, float]]):
-    """Transform rows into nested dict plus sorted labels."""
-    data = defaultdict(dict)
-    months_set = set()
-    categories_set = set()
-    for month, category, total_spent in rows:
-        data[month][category] = total_spent
-        months_set.add(month)
-        categories_set.add(category)
-    months = sorted(months_set)
-    categories = sorted(categories_set)
-    return data, months, categories
+def process_data(rows: np.ndarray) -> pd.DataFrame:
+    """Pivot historic rows into a months x categories frame, zero-filled and sorted."""
+    df = pd.DataFrame(rows)
+    return df.pivot(index="month", columns="category", values="total_spent").fillna(0)
 
 
-def plot_monthly_spendings(data, months: Sequence[str], categories: Sequence[str]) -> Figure:
+def plot_monthly_spendings(pivot: pd.DataFrame) -> Figure:
     """Plot monthly spendings per category and return the figure."""
     fig, ax = plt.subplots(figsize=(10, 5))
-    for category in categories:
-        spendings = [data.get(month, {}).get(category, 0) for month in months]
-        ax.plot(months, spendings, label=category)
+    # One call draws a line per column of the months x categories matrix
+    ax.plot(pivot.index.tolist(), pivot.to_numpy(), label=pivot.columns.tolist())
     ax.set_title("Monthly Spendings by Category")
     ax.set_xlabel("Month")
     ax.set_ylabel("Amount Spent")
@@ -64,17 +58,12 @@ def plot_monthly_spendings(data, months: Sequence[str], categories: Sequence[str
     return fig
 
 
-def plot_category_spendings_overall(data) -> Figure:
+def plot_category_spendings_overall(pivot: pd.DataFrame) -> Figure:
     """Plot overall spendings distribution."""
-    overall_spendings = defaultdict(float)
-    for month in data:
-        for category in data[month]:
-            overall_spendings[category] += float(data[month][category])
-    labels = list(overall_spendings.keys())
-    amounts = list(overall_spendings.values())
+    totals = pivot.sum(axis=0)
 
     fig, ax = plt.subplots(figsize=(6, 6))
-    ax.pie(amounts, labels=labels, autopct="%1.1f%%")
+    ax.pie(totals.to_numpy(), labels=totals.index.tolist(), autopct="%1.1f%%")
     ax.set_title("Overall Spendings Distribution by Category")
     return fig
 
@@ -82,34 +71,24 @@ def plot_category_spendings_overall(data) -> Figure:
 def fetch_dataframe() -> pd.DataFrame:
     """Fetch expense data aggregated monthly/category into a DataFrame."""
     query = """
-        SELECT DATE_FORMAT(t.date, '%Y-%m') AS month,
-               t.categoryid,
+        SELECT tm.month,
+               tm.categoryid,
                c.name AS category_name,
-               SUM(t.amount) AS total_spent
-        FROM transaction t
-        JOIN category c ON t.categoryid = c.categoryid
-        WHERE t.type = 'expense'
-        GROUP BY month, t.categoryid, category_name
-        ORDER BY month, category_name
+               tm.total AS total_spent,
+               CASE WHEN c.name IN ('Food', 'Rent', 'Utilities', 'Health')
+                    THEN 'necessary'
+                    ELSE 'discretionary'
+               END AS necessity
+        FROM transaction_monthly tm
+        JOIN category c ON tm.categoryid = c.categoryid
+        ORDER BY tm.month, category_name
     """
 
-    conn = get_connection()
-    try:
-        df = pd.read_sql(query, conn)
-    finally:
-        conn.close()
-
-    category_necessity = {
-        "Food": "necessary",
-        "Rent": "necessary",
-        "Utilities": "necessary",
-        "Entertainment": "discretionary",
-        "Travel": "discretionary",
-        "Shopping": "discretionary",
-        "Health": "necessary",
-        "Miscellaneous": "discretionary",
-    }
-    df["necessity"] = df["category_name"].map(category_necessity).fillna("discretionary")
+    with db_cursor() as (_, cursor):
+        cursor.execute(query)
+        df = pd.DataFrame.from_records(
+            cursor.fetchall(), columns=cursor.column_names, coerce_float=True
+        )
     return df
 
 
@@ -127,16 +106,24 @@ def prepare_data(df: pd.DataFrame) -> PreparedData:
 
 
 def train_predict(pivot: pd.DataFrame) -> Dict[str, float]:
-    """Train linear regression per category and predict next month."""
-    model = LinearRegression()
-    predictions: Dict[str, float] = {}
-    feature = pivot[["month_idx"]]
-    for category in pivot.columns[:-1]:  # skip month_idx
-        y = pivot[category]
-        model.fit(feature, y)
-        next_month_idx = np.array([[pivot["month_idx"].max() + 1]])
-        predictions[category] = float(model.predict(next_month_idx)[0])
-    return predictions
+    """Fit a linear trend per category and predict next month.
+
+    Every category shares the month index as its only feature, so the
+    least-squares slope and intercept are computed for all categories at once.
+    """
+    categories = pivot.columns[:-1]  # skip month_idx
+    x = pivot["month_idx"].to_numpy(dtype=float)
+    y = pivot[categories].to_numpy(dtype=float)
+    x_centered = x - x.mean()
+    denominator = (x_centered**2).sum()
+    if denominator:
+        slope = x_centered @ (y - y.mean(axis=0)) / denominator
+    else:
+        slope = np.zeros(y.shape[1])
+    intercept = y.mean(axis=0) - slope * x.mean()
+    next_month_idx = x.max() + 1
+    predictions = intercept + slope * next_month_idx
+    return dict(zip(categories, predictions.tolist()))
 
 
 def plot_spendings(pivot: pd.DataFrame, predictions: Dict[str, float]) -> Figure:
@@ -170,13 +157,12 @@ def recommend_savings(
 ) -> List[str]:
     """Return textual recommendations based on predicted spendings."""
     results: List[str] = []
+    necessity_map = dict(
+        df_with_necessity.drop_duplicates("category_name")
+        .set_index("category_name")["necessity"]
+    )
     for category, amount in predictions.items():
-        necessity = (
-            df_with_necessity[df_with_necessity["category_name"] == category]["necessity"]
-            .iloc[0]
-            if not df_with_necessity[df_with_necessity["category_name"] == category].empty
-            else "discretionary"
-        )
+        necessity = necessity_map.get(category, "discretionary")
         if necessity == "discretionary" and amount > threshold:
             results.append(
                 f"Consider reducing spending in discretionary category '{category}': "
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
 import secrets
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, List, Mapping, Optional, Sequence
 
 from mysql.connector import Error
 
@@ -37,40 +38,77 @@ class UserSession:
     role: str
 
 
-def hash_password(password: str, salt: Optional[str] = None) -> tuple[str, str]:
-    """Hash a password using SHA-256 with salt.
+# scrypt cost parameters for new hashes; stored alongside each hash so they can be raised later
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def _scrypt_hex(password: str, salt: str, n: int, r: int, p: int) -> str:
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt.encode("utf-8"), n=n, r=r, p=p, dklen=32
+    ).hex()
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with scrypt and a random salt.
     
     Args:
         password: Plain text password to hash.
-        salt: Optional salt. If None, generates a new random salt.
     
     Returns:
-        Tuple of (hashed_password, salt) as hex strings.
+        Encoded hash in ``scrypt$n$r$p$salt$hash`` format.
     """
-    if salt is None:
-        salt = secrets.token_hex(16)
-    
-    # Combine password and salt
-    salted_password = password + salt
-    # Hash using SHA-256
-    hashed = hashlib.sha256(salted_password.encode("utf-8")).hexdigest()
-    
-    return hashed, salt
+    salt = secrets.token_hex(16)
+    hashed = _scrypt_hex(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt}${hashed}"
 
 
-def verify_password(password: str, stored_hash: str, salt: str) -> bool:
-    """Verify a password against a stored hash and salt.
+def verify_password(password: str, stored_password: str) -> bool:
+    """Verify a password against a stored password value.
+    
+    Accepts scrypt hashes from :func:`hash_password` as well as the legacy
+    SHA-256 ``hash:salt`` format and legacy plaintext values.
     
     Args:
         password: Plain text password to verify.
-        stored_hash: Previously hashed password.
-        salt: Salt used during hashing.
+        stored_password: Value stored in the login table.
     
     Returns:
         True if password matches, False otherwise.
     """
-    computed_hash, _ = hash_password(password, salt)
-    return computed_hash == stored_hash
+    if stored_password.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, stored_hash = stored_password.split("$")
+            computed_hash = _scrypt_hex(password, salt, int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(computed_hash.encode(), stored_hash.encode("utf-8"))
+    if ":" in stored_password:
+        # Legacy single-round SHA-256 of password + salt
+        stored_hash, salt = stored_password.split(":", 1)
+        computed_hash = hashlib.sha256((password + salt).encode("utf-8")).hexdigest()
+        return hmac.compare_digest(computed_hash.encode(), stored_hash.encode("utf-8"))
+    # Legacy plaintext
+    return hmac.compare_digest(stored_password.encode("utf-8"), password.encode("utf-8"))
+
+
+def needs_rehash(stored_password: str) -> bool:
+    """Return True if a stored password is not a scrypt hash with current parameters."""
+    return not stored_password.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+# Insert user
+_USER_INSERT_SQL = """
+    INSERT INTO user (name, email, contact)
+    VALUES (%s, %s, %s)
+"""
+
+# Insert login credentials
+_LOGIN_INSERT_SQL = """
+    INSERT INTO login (userid, password, role)
+    VALUES (%s, %s, %s)
+"""
 
 
 def register_user(
@@ -97,42 +135,75 @@ def register_user(
     """
     # Check if email already exists
     check_query = "SELECT userid FROM user WHERE email = %s"
+    
+    # Hash the password before taking a connection so it is held only for the queries
+    stored_password = hash_password(password)
+    
+    # Check the email and create both rows in one transaction on one connection
     try:
-        with db_cursor() as (_, cursor):
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
             cursor.execute(check_query, (email,))
             if cursor.fetchone():
                 raise AuthenticationError(f"Email {email} is already registered.")
+            
+            cursor.execute(_USER_INSERT_SQL, (name, email, contact))
+            userid = cursor.lastrowid
+            cursor.execute(_LOGIN_INSERT_SQL, (userid, stored_password, role))
+            
+            logger.info("User registered: %s (ID: %s)", email, userid)
+            return userid
     except Error as exc:
-        raise AuthenticationError(f"Database error during registration check: {exc}") from exc
+        raise AuthenticationError(f"Failed to register user: {exc}") from exc
+
+
+def register_users_bulk(users: Sequence[Mapping[str, Any]]) -> List[int]:
+    """Register many users in one transaction with batched inserts.
     
-    # Hash the password
-    password_hash, salt = hash_password(password)
+    Args:
+        users: One mapping per user with the keyword arguments of
+            :func:`register_user` (``name``, ``email``, ``password`` and
+            optionally ``contact`` and ``role``).
     
-    # Insert user
-    user_query = """
-        INSERT INTO user (name, email, contact)
-        VALUES (%s, %s, %s)
-    """
+    Returns:
+        The newly created user IDs, in input order.
     
-    # Insert login credentials
-    login_query = """
-        INSERT INTO login (userid, password, role)
-        VALUES (%s, %s, %s)
+    Raises:
+        AuthenticationError: If registration fails (e.g., an email already exists).
     """
+    if not users:
+        return []
+    
+    emails = [user["email"] for user in users]
+    placeholders = ", ".join(["%s"] * len(emails))
+    check_query = f"SELECT email FROM user WHERE email IN ({placeholders})"
+    ids_query = f"SELECT email, userid FROM user WHERE email IN ({placeholders})"
+    
+    user_rows = [(user["name"], user["email"], user.get("contact")) for user in users]
+    # Hash every password up front so the connection is held only for the queries
+    stored_passwords = [hash_password(user["password"]) for user in users]
     
     try:
-        with db_cursor(commit=True) as (conn, cursor):
-            cursor.execute(user_query, (name, email, contact))
-            userid = cursor.lastrowid
+        with db_cursor(commit=True) as (_, cursor):
+            cursor.execute(check_query, emails)
+            existing = [row[0] for row in cursor.fetchall()]
+            if existing:
+                raise AuthenticationError(f"Emails already registered: {', '.join(existing)}")
             
-            # Store password as hash:salt format for easy retrieval
-            stored_password = f"{password_hash}:{salt}"
-            cursor.execute(login_query, (userid, stored_password, role))
+            # executemany sends a single multi-row INSERT for each table
+            cursor.executemany(_USER_INSERT_SQL, user_rows)
+            # Look the IDs up rather than assuming the auto-increment range is contiguous
+            cursor.execute(ids_query, emails)
+            userids = dict(cursor.fetchall())
+            login_rows = [
+                (userids[user["email"]], stored_password, user.get("role", "user"))
+                for user, stored_password in zip(users, stored_passwords)
+            ]
+            cursor.executemany(_LOGIN_INSERT_SQL, login_rows)
             
-            logger.info(f"User registered: {email} (ID: {userid})")
-            return userid
+            logger.info("Registered %s users in bulk", len(users))
+            return [userids[email] for email in emails]
     except Error as exc:
-        raise AuthenticationError(f"Failed to register user: {exc}") from exc
+        raise AuthenticationError(f"Failed to register users: {exc}") from exc
 
 
 def authenticate_user(email: str, password: str) -> Optional[UserSession]:
@@ -152,45 +223,36 @@ def authenticate_user(email: str, password: str) -> Optional[UserSession]:
         WHERE u.email = %s
     """
     
+    update_query = "UPDATE login SET password = %s WHERE userid = %s"
+    
     try:
         with db_cursor() as (_, cursor):
             cursor.execute(query, (email,))
             row = cursor.fetchone()
-            
-            if not row:
-                logger.warning(f"Authentication failed: email not found: {email}")
-                return None
-            
-            userid, email, name, stored_password, role = row
-            
-            # Parse stored password (format: hash:salt)
-            if ":" not in stored_password:
-                # Legacy plaintext password - migrate it
-                logger.warning(f"Legacy plaintext password detected for user {email}, migrating...")
-                password_hash, salt = hash_password(password)
-                stored_password = f"{password_hash}:{salt}"
-                
-                # Update the password in database
-                update_query = "UPDATE login SET password = %s WHERE userid = %s"
-                with db_cursor(commit=True) as (_, update_cursor):
-                    update_cursor.execute(update_query, (stored_password, userid))
-                
-                # For legacy passwords, check if plaintext matches
-                if stored_password.split(":")[0] == password:
-                    return UserSession(userid=userid, email=email, name=name, role=role)
-                return None
-            
-            stored_hash, salt = stored_password.split(":", 1)
-            
-            if verify_password(password, stored_hash, salt):
-                logger.info(f"User authenticated: {email} (ID: {userid})")
-                return UserSession(userid=userid, email=email, name=name, role=role)
-            
-            logger.warning(f"Authentication failed: invalid password for {email}")
+        
+        if not row:
+            logger.warning("Authentication failed: email not found: %s", email)
+            return None
+        
+        userid, email, name, stored_password, role = row
+        
+        # Verify outside the cursor block so the KDF does not hold a pooled connection
+        if not verify_password(password, stored_password):
+            logger.warning("Authentication failed: invalid password for %s", email)
             return None
+        
+        # Upgrade legacy plaintext / SHA-256 (or outdated scrypt) hashes now that we know the password
+        if needs_rehash(stored_password):
+            logger.info("Upgrading stored password hash for user %s", email)
+            new_stored = hash_password(password)
+            with db_cursor(commit=True) as (_, update_cursor):
+                update_cursor.execute(update_query, (new_stored, userid))
+        
+        logger.info("User authenticated: %s (ID: %s)", email, userid)
+        return UserSession(userid=userid, email=email, name=name, role=role)
             
     except Error as exc:
-        logger.error(f"Database error during authentication: {exc}")
+        logger.error("Database error during authentication: %s", exc)
         return None
 
 
@@ -208,40 +270,33 @@ def change_password(userid: int, old_password: str, new_password: str) -> bool:
     Raises:
         AuthenticationError: If database operation fails.
     """
-    # First verify old password
     query = "SELECT password FROM login WHERE userid = %s"
     
+    # Only replace the hash that was verified, in case it changed in between
+    update_query = "UPDATE login SET password = %s WHERE userid = %s AND password = %s"
+    
     try:
-        with db_cursor() as (_, cursor):
+        with db_cursor(prepared=True) as (_, cursor):
             cursor.execute(query, (userid,))
             row = cursor.fetchone()
-            
-            if not row:
-                raise AuthenticationError("User not found.")
-            
-            stored_password = row[0]
-            
-            # Handle legacy plaintext or hashed passwords
-            if ":" in stored_password:
-                stored_hash, salt = stored_password.split(":", 1)
-                if not verify_password(old_password, stored_hash, salt):
-                    return False
-            else:
-                # Legacy plaintext
-                if stored_password != old_password:
-                    return False
-            
-            # Hash new password
-            new_hash, new_salt = hash_password(new_password)
-            new_stored = f"{new_hash}:{new_salt}"
-            
-            # Update password
-            update_query = "UPDATE login SET password = %s WHERE userid = %s"
-            with db_cursor(commit=True) as (_, update_cursor):
-                update_cursor.execute(update_query, (new_stored, userid))
-            
-            logger.info(f"Password changed for user ID: {userid}")
-            return True
+        
+        if not row:
+            raise AuthenticationError("User not found.")
+        
+        stored_password = row[0]
+        
+        # Verify and hash outside the cursor blocks so the KDF does not hold a pooled connection
+        if not verify_password(old_password, stored_password):
+            return False
+        new_stored = hash_password(new_password)
+        
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
+            cursor.execute(update_query, (new_stored, userid, stored_password))
+            if not cursor.rowcount:
+                return False
+        
+        logger.info("Password changed for user ID: %s", userid)
+        return True
             
     except Error as exc:
         raise AuthenticationError(f"Failed to change password: {exc}") from exc
@@ -264,7 +319,7 @@ def get_user_role(userid: int) -> Optional[str]:
             row = cursor.fetchone()
             return row[0] if row else None
     except Error as exc:
-        logger.error(f"Error fetching user role: {exc}")
+        logger.error("Error fetching user role: %s", exc)
         return None
 
 
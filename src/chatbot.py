@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import json
-import subprocess
+import os
+import re
 import textwrap
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Generator, Iterable, Iterator, List, Optional, Tuple
 
+import requests
 from mysql.connector import Error
 
 from .db import db_cursor
@@ -15,28 +20,47 @@ from .logger import get_logger
 
 logger = get_logger("chatbot")
 
+_DANGEROUS_SQL_RE = re.compile(r"\b(?:DROP|TRUNCATE|DELETE|ALTER)\b", re.IGNORECASE)
+_SELECT_STAR_GROUP_BY_RE = re.compile(r"\bSELECT\s+\*[\s\S]*\bGROUP\s+BY\b", re.IGNORECASE)
+# Applied at the first "SQL:" marker (found with str.find); captures up to the next "Output:"
+# unless another SQL line starts first
+_AGENT_RESPONSE_RE = re.compile(
+    r"SQL:(?P<sql>(?:(?!\nSQL:).)*?)Output:(?P<explanation>.*)", re.DOTALL
+)
+_FETCH_BATCH_SIZE = 1000
 
-def ask_agent(prompt: str, model: str = "llama3") -> str:
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+# Reused across calls so requests to the resident Ollama server share keep-alive connections
+_OLLAMA_SESSION = requests.Session()
+
+
+def ask_agent(prompt: str, model: str = "llama3", timeout: float = 120) -> str:
     """Invoke the Ollama model with the provided prompt."""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model],
-            input=prompt.encode("utf-8"),
-            capture_output=True,
-            check=True,
+        response = _OLLAMA_SESSION.post(
+            f"{OLLAMA_URL}/api/generate",
+            json={"model": model, "prompt": prompt, "stream": False},
+            timeout=timeout,
         )
-    except subprocess.CalledProcessError as exc:
-        raise RuntimeError(
-            f"Ollama invocation failed with exit code {exc.returncode}: {exc.stderr.decode('utf-8', 'ignore')}"
-        ) from exc
-    return result.stdout.decode("utf-8").strip()
+        response.raise_for_status()
+        return response.json()["response"].strip()
+    except requests.RequestException as exc:
+        raise RuntimeError(f"Ollama request failed: {exc}") from exc
+    except (KeyError, ValueError) as exc:
+        raise RuntimeError(f"Unexpected Ollama response: {exc}") from exc
 
 
-def fetch_schema(table_name: str) -> List[Dict[str, str | None]]:
-    """Return schema metadata for the given table."""
+@lru_cache(maxsize=None)
+def _describe_table(table_name: str) -> Tuple[Tuple, ...]:
+    """Run DESCRIBE once per table; the schema is static for the process lifetime."""
     with db_cursor() as (_, cursor):
         cursor.execute(f"DESCRIBE {table_name}")
-        rows = cursor.fetchall()
+        return tuple(cursor.fetchall())
+
+
+def fetch_schema(table_name: str) -> List[Dict[str, str | None]]:
+    """Return schema metadata for the given table."""
+    rows = _describe_table(table_name)
     schema = [
         {
             "field": row[0],
@@ -51,12 +75,66 @@ def fetch_schema(table_name: str) -> List[Dict[str, str | None]]:
     return schema
 
 
+@lru_cache(maxsize=None)
 def format_schema_for_prompt(table_name: str) -> str:
     """Serialize schema as JSON for prompt injection."""
     schema = fetch_schema(table_name)
     return json.dumps({table_name: schema}, indent=4)
 
 
+_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    You are a SQL assistant connected to a MySQL database for an expense tracking application.
+
+    Database schema:
+    1. Transaction Table: {transaction_schema}
+    2. Category Table: {category_schema}
+
+    {user_filter_note}
+
+    You have complete knowledge of the schema above. The user is not allowed to provide additional schema details.
+    You must use only the tables and columns listed. Assume expenses are stored in the `transaction` table and categories in `category`.
+
+    RESPONSE FORMAT (mandatory):
+    SQL: <one fully-formed SQL statement using the schema above>
+    Output: <brief natural-language summary of what the query returns>
+
+    RULES (enforced, do not violate):
+    - Never ask the user for schema information or clarifications—always produce the best possible SQL with the given schema.
+    - Always use the exact table and column names from the schema.
+    - Prefer joins between `transaction` and `category` tables when category names are involved.
+    - Use aggregate functions (SUM, MAX, MIN, AVG, COUNT) when requested.
+    - For filters like dates or categories, include appropriate WHERE clauses.
+    - For date filters, use functions like MONTH(date), YEAR(date), DATE_FORMAT(date, '%Y-%m'), etc.
+    - Ensure every SELECT list column is either aggregated or appears in the GROUP BY clause (MySQL ONLY_FULL_GROUP_BY).
+    - Never use SELECT * in queries that include GROUP BY; explicitly list required columns.
+    - When the user greets without a request, reply with a short greeting and stop (no SQL).
+    - Otherwise ALWAYS return both the SQL and Output lines exactly once.
+    - Do not wrap the SQL in markdown code fences.
+    - Use proper SQL syntax with semicolons at the end.
+
+    EXAMPLES:
+    User: "Show my total expenses this month"
+    SQL: SELECT SUM(amount) AS total_expense FROM transaction WHERE type = 'expense' AND userid = {example_userid} AND MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE());
+    Output: Shows the total amount of all expense transactions for the current month.
+
+    User: "What did I spend on food?"
+    SQL: SELECT SUM(t.amount) AS total_spent FROM transaction t JOIN category c ON t.categoryid = c.categoryid WHERE t.userid = {example_userid} AND t.type = 'expense' AND c.name LIKE '%Food%';
+    Output: Shows the total amount spent on food-related categories.
+
+    User request:
+    {user_message}
+    """
+).strip()
+
+_USER_FILTER_NOTE_TEMPLATE = textwrap.dedent(
+    """
+    IMPORTANT: All queries must filter by userid = {userid} to show only the current user's data.
+    Always include "WHERE userid = {userid}" (or add it to existing WHERE clauses with AND).
+    """
+)
+
+
 def build_prompt(user_message: str, userid: int | None = None) -> str:
     """Build the LLM prompt including schemas and instructions.
     
@@ -64,60 +142,17 @@ def build_prompt(user_message: str, userid: int | None = None) -> str:
         user_message: The user's natural language query.
         userid: Optional user ID to filter queries by user.
     """
-    transaction_schema = format_schema_for_prompt("transaction")
-    category_schema = format_schema_for_prompt("category")
-    
     user_filter_note = ""
     if userid is not None:
-        user_filter_note = f"""
-        IMPORTANT: All queries must filter by userid = {userid} to show only the current user's data.
-        Always include "WHERE userid = {userid}" (or add it to existing WHERE clauses with AND).
-        """
+        user_filter_note = _USER_FILTER_NOTE_TEMPLATE.format(userid=userid)
     
-    return textwrap.dedent(
-        f"""
-        You are a SQL assistant connected to a MySQL database for an expense tracking application.
-
-        Database schema:
-        1. Transaction Table: {transaction_schema}
-        2. Category Table: {category_schema}
-
-        {user_filter_note}
-
-        You have complete knowledge of the schema above. The user is not allowed to provide additional schema details.
-        You must use only the tables and columns listed. Assume expenses are stored in the `transaction` table and categories in `category`.
-
-        RESPONSE FORMAT (mandatory):
-        SQL: <one fully-formed SQL statement using the schema above>
-        Output: <brief natural-language summary of what the query returns>
-
-        RULES (enforced, do not violate):
-        - Never ask the user for schema information or clarifications—always produce the best possible SQL with the given schema.
-        - Always use the exact table and column names from the schema.
-        - Prefer joins between `transaction` and `category` tables when category names are involved.
-        - Use aggregate functions (SUM, MAX, MIN, AVG, COUNT) when requested.
-        - For filters like dates or categories, include appropriate WHERE clauses.
-        - For date filters, use functions like MONTH(date), YEAR(date), DATE_FORMAT(date, '%Y-%m'), etc.
-        - Ensure every SELECT list column is either aggregated or appears in the GROUP BY clause (MySQL ONLY_FULL_GROUP_BY).
-        - Never use SELECT * in queries that include GROUP BY; explicitly list required columns.
-        - When the user greets without a request, reply with a short greeting and stop (no SQL).
-        - Otherwise ALWAYS return both the SQL and Output lines exactly once.
-        - Do not wrap the SQL in markdown code fences.
-        - Use proper SQL syntax with semicolons at the end.
-
-        EXAMPLES:
-        User: "Show my total expenses this month"
-        SQL: SELECT SUM(amount) AS total_expense FROM transaction WHERE type = 'expense' AND userid = {userid if userid else 'X'} AND MONTH(date) = MONTH(CURDATE()) AND YEAR(date) = YEAR(CURDATE());
-        Output: Shows the total amount of all expense transactions for the current month.
-
-        User: "What did I spend on food?"
-        SQL: SELECT SUM(t.amount) AS total_spent FROM transaction t JOIN category c ON t.categoryid = c.categoryid WHERE t.userid = {userid if userid else 'X'} AND t.type = 'expense' AND c.name LIKE '%Food%';
-        Output: Shows the total amount spent on food-related categories.
-
-        User request:
-        {user_message}
-        """
-    ).strip()
+    return _PROMPT_TEMPLATE.format(
+        transaction_schema=format_schema_for_prompt("transaction"),
+        category_schema=format_schema_for_prompt("category"),
+        user_filter_note=user_filter_note,
+        example_userid=userid if userid else "X",
+        user_message=user_message,
+    )
 
 
 @dataclass
@@ -128,28 +163,37 @@ class ParsedAgentResponse:
 
 def parse_agent_response(response: str) -> Optional[ParsedAgentResponse]:
     """Extract SQL and explanation from the LLM response."""
-    sql_marker = "SQL:"
-    output_marker = "Output:"
-    if sql_marker not in response:
-        return None
-    sql_start = response.find(sql_marker) + len(sql_marker)
-    output_start = response.find(output_marker, sql_start)
-    if output_start == -1:
+    start = response.find("SQL:")
+    if start < 0:
         return None
-    sql = response[sql_start:output_start].strip().strip("`")
-    explanation = response[output_start + len(output_marker) :].strip()
-    if "\nSQL:" in sql:
+    match = _AGENT_RESPONSE_RE.match(response, start)
+    if match is None:
         return None
+    sql = match.group("sql").strip().strip("`")
     if not sql:
         return None
-    return ParsedAgentResponse(sql=sql, explanation=explanation)
+    return ParsedAgentResponse(sql=sql, explanation=match.group("explanation").strip())
 
 
-def execute_sql(sql: str) -> Tuple[Optional[List[Tuple]], Optional[List[str]]]:
-    """Execute SQL and return rows plus column names when available."""
-    dangerous_keywords = {"DROP", "TRUNCATE"}
-    upper_sql = sql.upper()
-    if any(keyword in upper_sql for keyword in dangerous_keywords):
+def _iter_rows(cursor, batch_size: int) -> Iterator[Tuple]:
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield from batch
+
+
+@contextmanager
+def stream_sql(
+    sql: str, batch_size: int = _FETCH_BATCH_SIZE
+) -> Generator[Tuple[Optional[Iterator[Tuple]], Optional[List[str]]], None, None]:
+    """Execute SQL and yield a lazy row iterator plus column names when available.
+    
+    Rows are read from the (unbuffered) cursor ``batch_size`` at a time while
+    the caller iterates, so a large result set is never held in memory at once.
+    The iterator is only valid inside the ``with`` block.
+    """
+    if _DANGEROUS_SQL_RE.search(sql):
         raise ValueError("Destructive SQL statements are not permitted.")
 
     with db_cursor(commit=True) as (conn, cursor):
@@ -157,10 +201,18 @@ def execute_sql(sql: str) -> Tuple[Optional[List[Tuple]], Optional[List[str]]]:
         cursor.execute(sql)
         if cursor.description:
             columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            return rows, columns
-        # no resultset, commit already handled via context
-        return None, None
+            yield _iter_rows(cursor, batch_size), columns
+            # Discard anything the caller did not read so the commit can run
+            cursor.fetchall()
+        else:
+            # no resultset, commit already handled via context
+            yield None, None
+
+
+def execute_sql(sql: str) -> Tuple[Optional[List[Tuple]], Optional[List[str]]]:
+    """Execute SQL and return rows plus column names when available."""
+    with stream_sql(sql) as (rows, columns):
+        return (list(rows) if rows is not None else None), columns
 
 
 def chatbot_loop(input_func=input, print_func=print) -> None:
@@ -202,8 +254,7 @@ def chatbot_loop(input_func=input, print_func=print) -> None:
                 print_func("Bot: Unable to parse agent response.")
                 break
 
-            sql_upper = parsed.sql.upper()
-            if "GROUP BY" in sql_upper and "SELECT *" in sql_upper:
+            if _SELECT_STAR_GROUP_BY_RE.search(parsed.sql):
                 logger.warning("Detected SELECT * with GROUP BY. Requesting rewrite.")
                 if attempts == 0:
                     prompt += (
@@ -229,28 +280,34 @@ def chatbot_loop(input_func=input, print_func=print) -> None:
             logger.warning("Missing explanation for response.")
 
         try:
-            rows, columns = execute_sql(parsed.sql)
+            with stream_sql(parsed.sql) as (rows, columns):
+                if rows is None:
+                    print_func("Bot: Statement executed successfully.")
+                    continue
+                first_row = next(rows, None)
+                if first_row is None:
+                    print_func("Bot: Query returned no rows.")
+                    continue
+                # Rows are printed as they arrive, so the count is only known at the end
+                print_func("Bot: Actual Output")
+                row_count = print_rows(chain([first_row], rows), columns or [])
+                print_func(f"Bot: ({row_count} rows)")
         except (ValueError, Error) as err:
             print_func(f"Bot: SQL execution error → {err}")
             logger.error("SQL execution error: %s", err)
             continue
 
-        if rows is None:
-            print_func("Bot: Statement executed successfully.")
-        elif rows:
-            print_func(f"Bot: Actual Output ({len(rows)} rows)")
-            print_rows(rows, columns or [])
-        else:
-            print_func("Bot: Query returned no rows.")
-
 
-def print_rows(rows: List[Tuple], columns: List[str]) -> None:
-    """Print rows in a simple tabular format."""
+def print_rows(rows: Iterable[Tuple], columns: List[str]) -> int:
+    """Print rows in a simple tabular format and return how many were printed."""
     if columns:
         header = " | ".join(columns)
         print(header)
         print("-" * len(header))
+    row_count = 0
     for row in rows:
         print(" | ".join(str(item) for item in row))
+        row_count += 1
+    return row_count
 
 
@@ -2,46 +2,206 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Dict, Generator, Iterator, Sequence
 
 import mysql.connector
 from mysql.connector.connection import MySQLConnection
+from mysql.connector.errors import Error, PoolError
+from mysql.connector.pooling import MySQLConnectionPool
 
 from .config import DatabaseConfig
+from .logger import get_logger
+
+logger = get_logger("db")
+
+_POOL_SIZE = 16
+# Seconds a checkout waits for a connection to be returned to an exhausted pool
+_POOL_TIMEOUT = 5.0
+# Keyed by the caller's config; ``None`` is the environment config, parsed once
+_POOLS: Dict[DatabaseConfig | None, MySQLConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _connect_kwargs(config: DatabaseConfig) -> Dict[str, Any]:
+    return {
+        "host": config.host,
+        "user": config.user,
+        "password": config.password,
+        "database": config.database,
+        # C extension protocol layer (bundled in the mysql-connector-python wheels);
+        # the connector falls back to pure Python only where it is unavailable
+        "use_pure": False,
+        # Read-only blocks then never open a transaction, so checking a connection
+        # back in needs no ROLLBACK; db_cursor(commit=True) starts one explicitly
+        "autocommit": True,
+    }
+
+
+def _get_pool(config: DatabaseConfig | None) -> MySQLConnectionPool:
+    """Return the pool for ``config``, creating it on first use."""
+    pool = _POOLS.get(config)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(config)
+            if pool is None:
+                pool = _POOLS[config] = MySQLConnectionPool(
+                    pool_name=f"spendwise-{len(_POOLS)}",
+                    pool_size=_POOL_SIZE,
+                    # Skip the COM_RESET_CONNECTION round trip on every checkout. Sessions
+                    # stay clean because db_cursor rolls back unfinished transactions and
+                    # resets the session after errors; callers must not leave session
+                    # variables or temporary tables behind (none do).
+                    pool_reset_session=False,
+                    **_connect_kwargs(config or DatabaseConfig.from_env()),
+                )
+    return pool
 
 
 def get_connection(config: DatabaseConfig | None = None) -> MySQLConnection:
-    """Return a new MySQL connection using the provided or environment config."""
-    config = config or DatabaseConfig.from_env()
-    return mysql.connector.connect(
-        host=config.host,
-        user=config.user,
-        password=config.password,
-        database=config.database,
-    )
+    """Check out a pooled MySQL connection; closing it returns it to the pool.
+
+    When every pooled connection is in use the caller waits up to
+    ``_POOL_TIMEOUT`` seconds for one to be returned, so bursts of concurrent
+    requests queue for the pool instead of opening connections without bound.
+
+    Raises:
+        PoolError: No pooled connection became free in time.
+    """
+    pool = _get_pool(config)
+    deadline = None
+    delay = 0.005
+    while True:
+        try:
+            return pool.get_connection()
+        except PoolError:
+            now = time.monotonic()
+            if deadline is None:
+                logger.warning(
+                    "Connection pool %s exhausted; waiting for a connection", pool.pool_name
+                )
+                deadline = now + _POOL_TIMEOUT
+            elif now >= deadline:
+                logger.error(
+                    "No connection from pool %s within %ss", pool.pool_name, _POOL_TIMEOUT
+                )
+                raise
+            time.sleep(min(delay, deadline - now))
+            delay = min(delay * 2, 0.1)
+
+
+class PreparedCursor:
+    """Cursor facade that runs every statement as a server-side prepared statement.
+
+    One prepared cursor is kept per SQL text on the connection, so a repeated
+    statement is parsed and planned by the server once per connection and only
+    its parameters are sent afterwards. Result attributes (``fetchone``,
+    ``description``, ``lastrowid``, ...) refer to the last executed statement.
+    """
+
+    def __init__(self, conn: MySQLConnection) -> None:
+        self._conn = conn
+        self._statements = _statement_cache(conn)
+        self._cursor = None
+
+    def execute(self, operation: str, params: Sequence[Any] = ()) -> None:
+        entry = self._statements.get(operation)
+        if entry is None:
+            entry = self._statements[operation] = (operation, self._conn.cursor(prepared=True))
+        # The connector only re-uses a prepared statement when handed the same str object
+        operation, cursor = entry
+        cursor.execute(operation, params)
+        self._cursor = cursor
+
+    def close(self) -> None:
+        """Keep the cached statements open; they live as long as the connection."""
+        self._cursor = None
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+def _statement_cache(conn: MySQLConnection) -> Dict[str, tuple]:
+    """Return the per-session mapping of SQL text to its prepared cursor.
+
+    The cache lives on the underlying connection so it survives pool
+    checkouts, and is dropped whenever the server session it was prepared
+    in is gone (pool session reset on checkout, or a reconnect).
+    """
+    cnx = getattr(conn, "_cnx", conn)
+    session = cnx.connection_id
+    cached = getattr(cnx, "_prepared_cache", None)
+    if cached is None or cached[0] != session or _pool_resets_session(conn):
+        cached = cnx._prepared_cache = (session, {})
+    return cached[1]
+
+
+def _pool_resets_session(conn: MySQLConnection) -> bool:
+    pool = getattr(conn, "_cnx_pool", None)
+    return pool is not None and pool.reset_session
+
+
+def _reset_session(conn: MySQLConnection) -> bool:
+    """Reset the server session after a failed statement; return whether it worked.
+
+    COM_RESET_CONNECTION also deallocates the session's prepared statements,
+    so the per-connection statement cache is dropped with it.
+    """
+    cnx = getattr(conn, "_cnx", conn)
+    cnx._prepared_cache = None
+    try:
+        conn.cmd_reset_connection()
+    except Error:
+        return False
+    return True
 
 
 @contextmanager
 def db_cursor(
-    config: DatabaseConfig | None = None, commit: bool = False
+    config: DatabaseConfig | None = None, commit: bool = False, prepared: bool = False
 ) -> Generator[tuple[MySQLConnection, mysql.connector.cursor.MySQLCursor], None, None]:
     """Yield a managed connection and cursor pair.
 
     Args:
         config: Optional pre-loaded configuration.
         commit: Whether to commit at exit.
+        prepared: Whether to yield a :class:`PreparedCursor` that executes
+            statements as server-side prepared statements.
     """
     conn = get_connection(config)
-    cursor = conn.cursor()
+    cursor = PreparedCursor(conn) if prepared else conn.cursor()
+    error: BaseException | None = None
     try:
+        if commit:
+            conn.start_transaction()
         yield conn, cursor
         if commit:
             conn.commit()
+    except BaseException as exc:
+        error = exc
+        raise
     finally:
-        cursor.close()
-        conn.close()
-
-
+        try:
+            _release(conn, cursor, reset=isinstance(error, Error))
+        except Error:
+            if error is None:
+                raise
+            # Let the exception that ended the block propagate, not the cleanup failure
+            logger.warning("Failed to clean up connection after %r", error, exc_info=True)
 
 
+def _release(conn: MySQLConnection, cursor: Any, reset: bool) -> None:
+    """Close ``cursor`` and return ``conn`` to its pool with no transaction open."""
+    try:
+        cursor.close()
+        # Pooled sessions are not reset on checkout, so never hand an unfinished
+        # write transaction to the next caller
+        if not (reset and _reset_session(conn)) and conn.in_transaction:
+            conn.rollback()
+    finally:
+        conn.close()
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import threading
 from datetime import date
 from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
+from cachetools import LRUCache
 from mysql.connector import Error
 
-from .db import db_cursor, get_connection
+from .db import db_cursor
 
 
 class DatabaseOperationError(RuntimeError):
@@ -20,12 +23,64 @@ class DatabaseOperationError(RuntimeError):
         self.original_error = original_error
 
 
-@dataclass(frozen=True)
-class TransactionSummary:
+class TransactionSummary(NamedTuple):
     category: str
     total_amount: Decimal
 
 
+TransactionRow = Tuple[int, int, Union[Decimal, float], str, date, Optional[int]]
+BudgetRow = Tuple[int, Union[Decimal, float], str]
+
+_TRANSACTION_INSERT_SQL = """
+    INSERT INTO transaction (userid, categoryid, amount, type, date, paymentmethod)
+    VALUES {placeholders}
+"""
+_TRANSACTION_PLACEHOLDERS = "(%s, %s, %s, %s, %s, %s)"
+# Most transactions have no payment method; leave the column to its NULL default
+_TRANSACTION_NO_METHOD_INSERT_SQL = """
+    INSERT INTO transaction (userid, categoryid, amount, type, date)
+    VALUES {placeholders}
+"""
+_TRANSACTION_NO_METHOD_PLACEHOLDERS = "(%s, %s, %s, %s, %s)"
+# Rows per multi-row INSERT; keeps each statement well under max_allowed_packet
+_TRANSACTION_BATCH_SIZE = 500
+
+
+def _as_decimal(value: Decimal | float) -> Decimal:
+    """Return ``value`` as a ``Decimal``, converting floats through their shortest repr."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _insert_batches(cursor, query_template: str, placeholders: str, rows: List[tuple]) -> None:
+    for start in range(0, len(rows), _TRANSACTION_BATCH_SIZE):
+        batch = rows[start : start + _TRANSACTION_BATCH_SIZE]
+        query = query_template.format(placeholders=", ".join([placeholders] * len(batch)))
+        params = [
+            value
+            for userid, categoryid, amount, *rest in batch
+            for value in (userid, categoryid, _as_decimal(amount), *rest)
+        ]
+        cursor.execute(query, params)
+
+
+def _insert_transactions(cursor, rows: Sequence[TransactionRow]) -> int:
+    """Insert rows with one multi-row INSERT per batch and return the last lastrowid.
+    
+    Rows without a payment method go through the 5-column INSERT, the rest
+    through the 6-column one, so IDs are assigned group by group.
+    """
+    without_method = [row[:5] for row in rows if row[5] is None]
+    with_method = [row for row in rows if row[5] is not None]
+    _insert_batches(
+        cursor,
+        _TRANSACTION_NO_METHOD_INSERT_SQL,
+        _TRANSACTION_NO_METHOD_PLACEHOLDERS,
+        without_method,
+    )
+    _insert_batches(cursor, _TRANSACTION_INSERT_SQL, _TRANSACTION_PLACEHOLDERS, with_method)
+    return cursor.lastrowid
+
+
 def record_transaction(
     userid: int,
     categoryid: int,
@@ -35,46 +90,142 @@ def record_transaction(
     paymentmethod: int | None = None,
 ) -> int:
     """Insert a transaction record and return the generated ID."""
-    query = """
-        INSERT INTO transaction (userid, categoryid, amount, type, date, paymentmethod)
-        VALUES (%s, %s, %s, %s, %s, %s)
+    row = (userid, categoryid, amount, trans_type, transaction_date, paymentmethod)
+    try:
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
+            return _insert_transactions(cursor, [row])
+    except Error as exc:
+        raise DatabaseOperationError("Failed to record transaction.", exc) from exc
+
+
+def record_transactions(rows: Sequence[TransactionRow]) -> int:
+    """Insert many transaction records in a single commit and return how many were added.
+    
+    Each row is ``(userid, categoryid, amount, trans_type, transaction_date,
+    paymentmethod)``, matching the arguments of :func:`record_transaction`.
     """
+    if not rows:
+        return 0
+    try:
+        with db_cursor(commit=True) as (_, cursor):
+            _insert_transactions(cursor, rows)
+    except Error as exc:
+        raise DatabaseOperationError("Failed to record transactions.", exc) from exc
+    return len(rows)
 
-    params = (
-        userid,
-        categoryid,
-        str(amount),  # ensure Decimal compatibility
-        trans_type,
-        transaction_date,
-        paymentmethod,
-    )
 
+def record_transaction_with_status(
+    userid: int,
+    categoryid: int,
+    amount: Decimal | float,
+    trans_type: str,
+    transaction_date: date,
+    paymentmethod: int | None = None,
+) -> Tuple[int, Dict[str, Any], List[Dict[str, Any]]]:
+    """Insert a transaction and read back its budget status and the user's unread alerts.
+    
+    Runs the insert, the budget check for the transaction's category and month,
+    and the alert lookup on one connection in one transaction, so the results
+    include any alert the budget trigger raised for this insert.
+    
+    Returns:
+        Tuple of (generated transaction ID, budget status dict, up to 5 newest unread alerts).
+    """
+    row = (userid, categoryid, amount, trans_type, transaction_date, paymentmethod)
     try:
-        with db_cursor(commit=True) as (conn, cursor):
-            cursor.execute(query, params)
-            return cursor.lastrowid
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
+            transid = _insert_transactions(cursor, [row])
+            
+            # The budget checked is the one for the transaction's own month and year
+            status = _fetch_budget_status(
+                cursor, userid, categoryid, transaction_date.month, transaction_date.year
+            )
+            alerts = _fetch_alerts(
+                cursor, _alerts_sql(ALERT_COLUMNS, True), userid, _NEW_TRANSACTION_ALERT_LIMIT
+            )
+            return transid, status, alerts
     except Error as exc:
         raise DatabaseOperationError("Failed to record transaction.", exc) from exc
 
 
+_BUDGET_UPDATE_SQL = """
+    UPDATE budget
+    SET limitamount = CASE budgetid {limit_cases} END,
+        status = CASE budgetid {status_cases} END
+    WHERE budgetid IN ({budgetids})
+"""
+# Budgets per UPDATE; keeps each statement well under max_allowed_packet
+_BUDGET_BATCH_SIZE = 500
+
+
+def _update_budgets(cursor, rows: Sequence[BudgetRow]) -> None:
+    """Apply budget updates with one CASE-based UPDATE per batch."""
+    for start in range(0, len(rows), _BUDGET_BATCH_SIZE):
+        batch = rows[start : start + _BUDGET_BATCH_SIZE]
+        cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+        query = _BUDGET_UPDATE_SQL.format(
+            limit_cases=cases,
+            status_cases=cases,
+            budgetids=", ".join(["%s"] * len(batch)),
+        )
+        params: List[Any] = []
+        for budgetid, new_limitamount, _ in batch:
+            params += (budgetid, _as_decimal(new_limitamount))
+        for budgetid, _, new_status in batch:
+            params += (budgetid, new_status)
+        params += (budgetid for budgetid, _, _ in batch)
+        cursor.execute(query, params)
+
+
 def update_budget(budgetid: int, new_limitamount: Decimal | float, new_status: str) -> None:
     """Update the limit and status for a budget entry."""
-    query = """
-        UPDATE budget
-        SET limitamount = %s,
-            status = %s
-        WHERE budgetid = %s
-    """
+    try:
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
+            _update_budgets(cursor, [(budgetid, new_limitamount, new_status)])
+    except Error as exc:
+        raise DatabaseOperationError("Failed to update budget.", exc) from exc
 
+
+def update_budgets(rows: Sequence[BudgetRow]) -> int:
+    """Update many budgets in a single commit and return how many were given.
+    
+    Each row is ``(budgetid, new_limitamount, new_status)``, matching the
+    arguments of :func:`update_budget`.
+    """
+    if not rows:
+        return 0
     try:
         with db_cursor(commit=True) as (_, cursor):
-            cursor.execute(query, (str(new_limitamount), new_status, budgetid))
+            _update_budgets(cursor, rows)
     except Error as exc:
-        raise DatabaseOperationError("Failed to update budget.", exc) from exc
+        raise DatabaseOperationError("Failed to update budgets.", exc) from exc
+    return len(rows)
+
+
+# Per-user counter bumped by triggers on every transaction insert, update and delete
+# (database/transaction_version.sql); users without a row have version 0
+TRANSACTION_VERSION_SQL = "SELECT version FROM transaction_version WHERE userid = %s"
+
+
+def fetch_transaction_version(cursor, userid: int) -> int:
+    """Return the user's transaction version, which changes on every write to their rows."""
+    cursor.execute(TRANSACTION_VERSION_SQL, (userid,))
+    # fetchall() drains the result even when the user has no row yet
+    rows = cursor.fetchall()
+    return rows[0][0] if rows else 0
+
+
+# (userid, transaction version) -> tuple of TransactionSummary; stale versions age out of the LRU
+_SUMMARY_CACHE: LRUCache = LRUCache(maxsize=1024)
+_SUMMARY_CACHE_LOCK = threading.Lock()
 
 
 def view_user_summary(userid: int) -> List[TransactionSummary]:
-    """Return total spend per category for a user."""
+    """Return total spend per category for a user.
+
+    The aggregate is cached per user and only recomputed when the user's
+    transaction version changes, i.e. after any insert, update or delete.
+    """
     query = """
         SELECT c.name AS category, SUM(t.amount) AS total
         FROM transaction t
@@ -85,31 +236,186 @@ def view_user_summary(userid: int) -> List[TransactionSummary]:
     """
 
     try:
-        with db_cursor() as (_, cursor):
-            cursor.execute(query, (userid,))
-            rows: Iterable[Tuple[str, Decimal]] = cursor.fetchall()
+        with db_cursor(prepared=True) as (_, cursor):
+            key = (userid, fetch_transaction_version(cursor, userid))
+            with _SUMMARY_CACHE_LOCK:
+                summary = _SUMMARY_CACHE.get(key)
+            if summary is None:
+                cursor.execute(query, (userid,))
+                summary = tuple(map(TransactionSummary._make, cursor))
+                with _SUMMARY_CACHE_LOCK:
+                    _SUMMARY_CACHE[key] = summary
     except Error as exc:
+        error_msg = str(exc)
+        if "transaction_version" in error_msg and "doesn't exist" in error_msg.lower():
+            raise DatabaseOperationError(
+                "The transaction_version table is not installed. Please run:\n"
+                "  mysql -u root -p expense_tracker < database/transaction_version.sql",
+                exc
+            ) from exc
         raise DatabaseOperationError("Failed to fetch user summary.", exc) from exc
 
-    return [TransactionSummary(category=row[0], total_amount=row[1]) for row in rows]
+    return list(summary)
+
+
+# Primary-key columns fetch_first_id may be asked about, each with its fixed SQL text
+# so the per-connection prepared-statement cache can reuse it
+_FIRST_ID_SQL = {
+    (table, id_column): f"SELECT MIN({id_column}) FROM {table}"
+    for table, id_column in (
+        ("user", "userid"),
+        ("category", "categoryid"),
+        ("paymentmethod", "methodid"),
+        ("transaction", "transid"),
+        ("budget", "budgetid"),
+    )
+}
 
 
+@lru_cache(maxsize=32)
 def fetch_first_id(table: str, id_column: str) -> Optional[int]:
-    """Return the first ID from the specified table or None if empty."""
-    query = f"SELECT {id_column} FROM {table} ORDER BY {id_column} LIMIT 1"
-    with db_cursor() as (_, cursor):
+    """Return the first ID from the specified table or None if empty.
+    
+    Results are cached for the process lifetime; call
+    ``fetch_first_id.cache_clear()`` after inserting into an empty table.
+    
+    Raises:
+        ValueError: If ``(table, id_column)`` is not a known primary key.
+    """
+    query = _FIRST_ID_SQL.get((table, id_column))
+    if query is None:
+        raise ValueError(f"Unsupported ID column: {table}.{id_column}")
+    with db_cursor(prepared=True) as (_, cursor):
         cursor.execute(query)
-        result = cursor.fetchone()
-    return int(result[0]) if result else None
+        (first_id,) = cursor.fetchone()
+    return int(first_id) if first_id is not None else None
+
+
+# Inline equivalent of the check_budget_status stored procedure (single result set)
+_BUDGET_STATUS_SQL = """
+    SELECT s.userid,
+           s.categoryid,
+           s.month,
+           s.limit_amount,
+           s.spent_amount,
+           s.limit_amount - s.spent_amount AS remaining_amount,
+           ROUND((s.spent_amount / s.limit_amount) * 100, 2) AS percentage_used,
+           IF(s.limit_amount IS NULL, 'NO_BUDGET', 'active') AS status,
+           CASE
+               WHEN s.limit_amount IS NULL THEN 'N/A'
+               WHEN s.spent_amount >= s.limit_amount THEN 'EXCEEDED'
+               WHEN s.spent_amount >= (s.limit_amount * 0.9) THEN 'WARNING'
+               ELSE 'OK'
+           END AS alert_level
+    FROM (
+        SELECT p.userid,
+               p.categoryid,
+               p.month,
+               (SELECT b.limitamount
+                FROM budget b
+                WHERE b.userid = p.userid
+                  AND b.categoryid = p.categoryid
+                  AND b.month = p.month
+                  AND b.status = 'active'
+                LIMIT 1) AS limit_amount,
+               (SELECT COALESCE(SUM(t.amount), 0)
+                FROM transaction t
+                WHERE t.userid = p.userid
+                  AND t.categoryid = p.categoryid
+                  AND t.type = 'expense'
+                  AND MONTH(t.date) = p.month
+                  AND YEAR(t.date) = p.year) AS spent_amount
+        FROM (SELECT %s AS userid, %s AS categoryid, %s AS month, %s AS year) AS p
+    ) AS s
+"""
+
+# Inline equivalent of the get_user_alerts stored procedure
+# JSON expression for each alert field callers may request
+_ALERT_FIELDS = {
+    "alertid": "a.alertid",
+    "userid": "a.userid",
+    "budgetid": "a.budgetid",
+    "categoryid": "a.categoryid",
+    "category_name": "a.category_name",
+    "message": "a.message",
+    "alert_type": "a.alert_type",
+    "created_at": "REPLACE(CAST(a.created_at AS CHAR), ' ', 'T')",
+    "is_read": "a.is_read",
+}
+ALERT_COLUMNS: Tuple[str, ...] = tuple(_ALERT_FIELDS)
+# Most recent alerts returned per call, at most
+_ALERT_LIMIT = 100
+# Unread alerts returned alongside a newly recorded transaction
+_NEW_TRANSACTION_ALERT_LIMIT = 5
+
+# The alert list comes back as one JSON array in a single row. JSON_ARRAYAGG has no
+# ORDER BY of its own, so it runs as a window function over the sorted, capped rows.
+_USER_ALERTS_SQL = """
+    SELECT JSON_ARRAYAGG(JSON_OBJECT({fields})) OVER (
+               ORDER BY a.created_at DESC, a.alertid DESC
+               ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+           )
+    FROM (
+        SELECT ba.*, c.name AS category_name
+        FROM budget_alerts ba
+        LEFT JOIN category c ON c.categoryid = ba.categoryid
+        WHERE ba.userid = %s{unread_filter}
+        ORDER BY ba.created_at DESC, ba.alertid DESC
+        LIMIT %s
+    ) AS a
+    LIMIT 1
+"""
+
+
+@lru_cache(maxsize=32)
+def _alerts_sql(columns: Tuple[str, ...], unread_only: bool) -> str:
+    unknown = [column for column in columns if column not in _ALERT_FIELDS]
+    if unknown or not columns:
+        raise ValueError(f"Unsupported alert columns: {', '.join(unknown) or '(none)'}")
+    return _USER_ALERTS_SQL.format(
+        fields=", ".join(f"'{column}', {_ALERT_FIELDS[column]}" for column in columns),
+        unread_filter="\n          AND ba.is_read = FALSE" if unread_only else "",
+    )
+
+
+# Result column names keyed by SQL text, filled from the cursor on first execution
+_COLUMN_NAMES: Dict[str, Tuple[str, ...]] = {}
+
+
+def _column_names(cursor, query: str) -> Tuple[str, ...]:
+    """Return the result column names of ``query``, just executed on ``cursor``."""
+    columns = _COLUMN_NAMES.get(query)
+    if columns is None:
+        columns = _COLUMN_NAMES[query] = tuple(cursor.column_names)
+    return columns
+
+
+def _fetch_budget_status(
+    cursor, userid: int, categoryid: int, month: int, year: int
+) -> Dict[str, Any]:
+    cursor.execute(_BUDGET_STATUS_SQL, (userid, categoryid, month, year))
+    row = cursor.fetchone()
+    if not row:
+        return {}
+    return dict(zip(_column_names(cursor, _BUDGET_STATUS_SQL), row))
+
 
+def _fetch_alerts(cursor, query: str, userid: int, limit: int) -> List[Dict[str, Any]]:
+    cursor.execute(query, (userid, min(max(limit, 1), _ALERT_LIMIT)))
+    row = cursor.fetchone()
+    return json.loads(row[0]) if row and row[0] else []
 
-def check_budget_status(userid: int, categoryid: int, month: int) -> Dict[str, Any]:
-    """Check budget status using stored procedure.
+
+def check_budget_status(
+    userid: int, categoryid: int, month: int, year: Optional[int] = None
+) -> Dict[str, Any]:
+    """Check budget status for a user, category and month.
     
     Args:
         userid: User ID.
         categoryid: Category ID.
         month: Month number (1-12).
+        year: Year whose spending is counted; defaults to the current year.
     
     Returns:
         Dictionary with budget status information.
@@ -117,79 +423,88 @@ def check_budget_status(userid: int, categoryid: int, month: int) -> Dict[str, A
     Raises:
         DatabaseOperationError: If the operation fails.
     """
-    query = "CALL check_budget_status(%s, %s, %s)"
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        try:
-            # Use multi=True for stored procedures
-            for result in cursor.execute(query, (userid, categoryid, month), multi=True):
-                if result.with_rows:
-                    row = result.fetchone()
-                    if row:
-                        columns = [desc[0] for desc in result.description]
-                        return dict(zip(columns, row))
-            return {}
-        finally:
-            cursor.close()
-            conn.close()
+        with db_cursor() as (_, cursor):
+            return _fetch_budget_status(
+                cursor, userid, categoryid, month, year if year is not None else date.today().year
+            )
+    except Error as exc:
+        raise DatabaseOperationError("Failed to check budget status.", exc) from exc
+
+
+def get_user_alerts(
+    userid: int,
+    unread_only: bool = True,
+    columns: Sequence[str] = ALERT_COLUMNS,
+    limit: int = _ALERT_LIMIT,
+) -> List[Dict[str, Any]]:
+    """Get the most recent budget alerts for a user, newest first.
+    
+    Args:
+        userid: User ID.
+        unread_only: If True, return only unread alerts.
+        columns: Alert fields to return; a subset of :data:`ALERT_COLUMNS`.
+        limit: Maximum number of alerts to return, clamped to 1-100.
+    
+    Returns:
+        List of up to ``limit`` alert dictionaries.
+    
+    Raises:
+        ValueError: If ``columns`` names an unknown field.
+        DatabaseOperationError: If the operation fails.
+    """
+    query = _alerts_sql(tuple(columns), unread_only)
+    try:
+        with db_cursor() as (_, cursor):
+            return _fetch_alerts(cursor, query, userid, limit)
     except Error as exc:
         error_msg = str(exc)
-        if "does not exist" in error_msg.lower():
+        if "doesn't exist" in error_msg.lower():
             raise DatabaseOperationError(
-                "Stored procedures are not installed. Please run:\n"
+                "The budget_alerts table is not installed. Please run:\n"
                 "  mysql -u root -p expense_tracker < database/triggers.sql\n"
-                "  mysql -u root -p expense_tracker < database/procedures.sql\n"
                 "Or use: INSTALL_SQL.bat",
                 exc
             ) from exc
-        raise DatabaseOperationError("Failed to check budget status.", exc) from exc
+        raise DatabaseOperationError("Failed to fetch alerts.", exc) from exc
+
+
+_UNREAD_ALERT_COUNT_SQL = (
+    "SELECT COUNT(*) FROM budget_alerts WHERE userid = %s AND is_read = FALSE"
+)
 
 
-def get_user_alerts(userid: int, unread_only: bool = True) -> List[Dict[str, Any]]:
-    """Get budget alerts for a user using stored procedure.
+def count_unread_alerts(userid: int) -> int:
+    """Count a user's unread alerts, without the cap :func:`get_user_alerts` applies.
     
     Args:
         userid: User ID.
-        unread_only: If True, return only unread alerts.
     
     Returns:
-        List of alert dictionaries.
+        Number of unread alerts.
     
     Raises:
         DatabaseOperationError: If the operation fails.
     """
-    query = "CALL get_user_alerts(%s, %s)"
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        try:
-            # Use multi=True for stored procedures
-            for result in cursor.execute(query, (userid, unread_only), multi=True):
-                if result.with_rows:
-                    rows = result.fetchall()
-                    if rows:
-                        columns = [desc[0] for desc in result.description]
-                        return [dict(zip(columns, row)) for row in rows]
-            return []
-        finally:
-            cursor.close()
-            conn.close()
+        with db_cursor(prepared=True) as (_, cursor):
+            cursor.execute(_UNREAD_ALERT_COUNT_SQL, (userid,))
+            (count,) = cursor.fetchone()
     except Error as exc:
         error_msg = str(exc)
-        if "does not exist" in error_msg.lower():
+        if "doesn't exist" in error_msg.lower():
             raise DatabaseOperationError(
-                "Stored procedures are not installed. Please run:\n"
+                "The budget_alerts table is not installed. Please run:\n"
                 "  mysql -u root -p expense_tracker < database/triggers.sql\n"
-                "  mysql -u root -p expense_tracker < database/procedures.sql\n"
                 "Or use: INSTALL_SQL.bat",
                 exc
             ) from exc
-        raise DatabaseOperationError("Failed to fetch alerts.", exc) from exc
+        raise DatabaseOperationError("Failed to count alerts.", exc) from exc
+    return int(count)
 
 
 def mark_alert_read(alertid: int) -> None:
-    """Mark an alert as read using stored procedure.
+    """Mark an alert as read.
     
     Args:
         alertid: Alert ID to mark as read.
@@ -197,17 +512,16 @@ def mark_alert_read(alertid: int) -> None:
     Raises:
         DatabaseOperationError: If the operation fails.
     """
-    query = "CALL mark_alert_read(%s)"
+    query = "UPDATE budget_alerts SET is_read = TRUE WHERE alertid = %s"
     try:
-        with db_cursor(commit=True) as (_, cursor):
+        with db_cursor(commit=True, prepared=True) as (_, cursor):
             cursor.execute(query, (alertid,))
     except Error as exc:
         error_msg = str(exc)
-        if "does not exist" in error_msg.lower():
+        if "doesn't exist" in error_msg.lower():
             raise DatabaseOperationError(
-                "Stored procedures are not installed. Please run:\n"
+                "The budget_alerts table is not installed. Please run:\n"
                 "  mysql -u root -p expense_tracker < database/triggers.sql\n"
-                "  mysql -u root -p expense_tracker < database/procedures.sql\n"
                 "Or use: INSTALL_SQL.bat",
                 exc
             ) from exc
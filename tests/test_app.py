@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+import unittest
+from unittest import mock
+
+import brotli
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import app as app_module
+from app import app
+from src import operations
+
+
+class FakeCursor:
+    """Cursor double answering each statement from ``results(query, params)``."""
+
+    def __init__(self, results):
+        self.results = results
+        self.executed = []
+        self.description = None
+        self.lastrowid = 1
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.executed.append((query, list(params)))
+        columns, rows = self.results(query, list(params))
+        self.description = [(column,) for column in columns] if columns else None
+        self._rows = list(rows)
+
+    @property
+    def column_names(self):
+        return tuple(desc[0] for desc in self.description or ())
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs the Flask test client as a logged-in user against a fake database."""
+
+    def setUp(self):
+        operations._COLUMN_NAMES.clear()
+        self.cursor = FakeCursor(self.results)
+
+        @contextmanager
+        def fake_db_cursor(*args, **kwargs):
+            yield None, self.cursor
+
+        for module in (app_module, operations):
+            patcher = mock.patch.object(module, "db_cursor", fake_db_cursor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        app.testing = True
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session["user"] = {"userid": 7, "email": "a@b.c", "name": "A", "role": "user"}
+
+    def results(self, query, params):
+        return (), []
+
+    def statements(self, fragment):
+        return [params for query, params in self.cursor.executed if fragment in query]
+
+
+class CompressionTests(AppTestCase):
+    def results(self, query, params):
+        columns = (
+            "budgetid", "userid", "categoryid", "limitamount", "month", "status", "category"
+        )
+        return columns, [(i, 7, 1, Decimal("100.00"), 3, "active", "Food") for i in range(2000)]
+
+    def test_streamed_rows_are_compressed_as_they_stream(self):
+        for encoding, decompress in (("br", brotli.decompress), ("gzip", gzip.decompress)):
+            response = self.client.get("/api/budgets", headers={"Accept-Encoding": encoding})
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.headers["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+            body = json.loads(decompress(response.get_data()))
+            self.assertEqual(len(body["budgets"]), 2000)
+
+    def test_streamed_rows_without_accept_encoding_are_plain(self):
+        response = self.client.get("/api/budgets", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(len(response.get_json()["budgets"]), 2000)
+
+    def test_buffered_response_is_compressed(self):
+        with app.test_request_context(headers={"Accept-Encoding": "br"}):
+            body = b"[" + b"1, " * 1024 + b"1]"
+            response = app.response_class(body, mimetype="application/json")
+            response = app.process_response(response)
+            self.assertEqual(response.headers.get("Content-Encoding"), "br")
+
+
+class TransactionsListingTests(AppTestCase):
+    stored_rows = 1000
+
+    def results(self, query, params):
+        if query == operations.TRANSACTION_VERSION_SQL:
+            return ("version",), [(1,)]
+        userid, limit, offset = params
+        row = (1, Decimal("5.25"), "expense", date(2024, 1, 2), None, "Food")
+        count = max(min(limit, self.stored_rows - offset), 0)
+        return ("transid",) * 7, [(offset + i, *row) for i in range(count)]
+
+    def test_streamed_body_parses_as_json(self):
+        response = self.client.get("/api/transactions?limit=3&offset=10")
+        self.assertTrue(response.is_streamed)
+        body = json.loads(response.get_data())
+        self.assertTrue(body["success"])
+        self.assertEqual([row["transid"] for row in body["transactions"]], [10, 11, 12])
+        self.assertEqual(
+            body["transactions"][0],
+            {
+                "transid": 10,
+                "categoryid": 1,
+                "amount": "5.25",
+                "type": "expense",
+                "date": "2024-01-02",
+                "paymentmethod": None,
+                "category_name": "Food",
+            },
+        )
+
+    def test_empty_listing_is_valid_json(self):
+        self.stored_rows = 0
+        response = self.client.get("/api/transactions")
+        self.assertEqual(json.loads(response.get_data()), {"success": True, "transactions": []})
+
+    def test_limit_and_offset_are_clamped(self):
+        for query_string, expected in (
+            ("", [7, 100, 0]),
+            ("?limit=0&offset=-5", [7, 1, 0]),
+            ("?limit=100000&offset=40", [7, app_module._MAX_TRANSACTIONS_PAGE, 40]),
+            ("?limit=abc&offset=xyz", [7, 100, 0]),
+        ):
+            self.cursor.executed.clear()
+            response = self.client.get("/api/transactions" + query_string)
+            self.assertEqual(response.status_code, 200, query_string)
+            self.assertEqual(self.statements("LIMIT"), [expected], query_string)
+
+
+class TransactionsETagTests(AppTestCase):
+    version = 3
+
+    def results(self, query, params):
+        if query == operations.TRANSACTION_VERSION_SQL:
+            return ("version",), [(self.version,)]
+        userid, limit, offset = params
+        row = (1, Decimal("5.00"), "expense", date(2024, 1, 2), None, "Food")
+        return ("transid",) * 7, [(offset + i, *row) for i in range(limit)]
+
+    def test_matching_validators_get_304_without_fetching_rows(self):
+        etag = self.client.get("/api/transactions").headers["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+        for validator in (etag, etag[2:], "*"):
+            self.cursor.executed.clear()
+            response = self.client.get("/api/transactions", headers={"If-None-Match": validator})
+            self.assertEqual(response.status_code, 304, validator)
+            self.assertEqual(self.statements("LIMIT"), [])
+
+    def test_version_change_invalidates_etag(self):
+        etag = self.client.get("/api/transactions").headers["ETag"]
+        self.version += 1
+        response = self.client.get("/api/transactions", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+class RecordTransactionTests(AppTestCase):
+    def results(self, query, params):
+        if query == operations._BUDGET_STATUS_SQL:
+            return ("userid", "categoryid", "alert_level"), [(7, 2, "WARNING")]
+        if "JSON_ARRAYAGG" in query:
+            return ("alerts",), [('[{"alertid": 4, "message": "80% used"}]',)]
+        return (), []
+
+    def post(self, **fields):
+        data = {"categoryid": "2", "amount": "12.50", "type": "expense", "date": "2024-03-05"}
+        return self.client.post("/api/transactions", json={**data, **fields})
+
+    def test_response_carries_recorded_status_and_alerts(self):
+        self.cursor.lastrowid = 41
+        response = self.post(paymentmethod="3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(),
+            {
+                "success": True,
+                "trans_id": 41,
+                "budget_status": {"userid": 7, "categoryid": 2, "alert_level": "WARNING"},
+                "alerts": [{"alertid": 4, "message": "80% used"}],
+            },
+        )
+        (insert_params,) = self.statements("INSERT")
+        self.assertEqual(insert_params, [7, 2, Decimal("12.50"), "expense", date(2024, 3, 5), 3])
+        self.assertEqual(self.statements("JSON_ARRAYAGG"), [[7, 5]])
+
+    def test_payment_method_is_optional(self):
+        for value in (None, ""):
+            self.cursor.executed.clear()
+            self.assertEqual(self.post(paymentmethod=value).status_code, 200)
+            (insert_params,) = self.statements("INSERT")
+            self.assertEqual(len(insert_params), 5, value)
+
+    def test_unparseable_payment_method_is_rejected(self):
+        for value in ("3 ", " 3", "3.0", "x", 3.0, True, [3]):
+            self.cursor.executed.clear()
+            response = self.post(paymentmethod=value)
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn("Invalid data format", response.get_json()["error"])
+            self.assertEqual(self.cursor.executed, [])
+
+    def test_missing_field_is_rejected_before_any_query(self):
+        response = self.client.post("/api/transactions", json={"categoryid": 2})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.cursor.executed, [])
+
+
+class UnreadAlertCountTests(AppTestCase):
+    def results(self, query, params):
+        return ("count",), [(250,)]
+
+    def test_count_is_not_capped_by_the_alert_list_limit(self):
+        response = self.client.get("/api/alerts/unread_count")
+        self.assertEqual(response.get_json(), {"success": True, "count": 250})
+        self.assertEqual(self.statements("COUNT(*)"), [[7]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+import unittest
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import auth
+
+
+class PasswordHashingTests(unittest.TestCase):
+    def test_scrypt_hash_round_trip(self):
+        stored = auth.hash_password("s3cret")
+        self.assertTrue(stored.startswith(f"scrypt${auth.SCRYPT_N}${auth.SCRYPT_R}${auth.SCRYPT_P}$"))
+        self.assertTrue(auth.verify_password("s3cret", stored))
+        self.assertFalse(auth.verify_password("wrong", stored))
+        self.assertFalse(auth.needs_rehash(stored))
+
+    def test_scrypt_hashes_are_salted(self):
+        self.assertNotEqual(auth.hash_password("s3cret"), auth.hash_password("s3cret"))
+
+    def test_scrypt_with_outdated_parameters_needs_rehash(self):
+        salt = "00" * 16
+        hashed = hashlib.scrypt(b"s3cret", salt=salt.encode(), n=2**10, r=8, p=1, dklen=32).hex()
+        stored = f"scrypt${2**10}$8$1${salt}${hashed}"
+        self.assertTrue(auth.verify_password("s3cret", stored))
+        self.assertTrue(auth.needs_rehash(stored))
+
+    def test_malformed_scrypt_value_rejected(self):
+        self.assertFalse(auth.verify_password("s3cret", "scrypt$not-a-hash"))
+
+    def test_legacy_sha256_hash(self):
+        salt = "abc123"
+        stored = hashlib.sha256(("s3cret" + salt).encode()).hexdigest() + ":" + salt
+        self.assertTrue(auth.verify_password("s3cret", stored))
+        self.assertFalse(auth.verify_password("wrong", stored))
+        self.assertTrue(auth.needs_rehash(stored))
+
+    def test_legacy_plaintext(self):
+        self.assertTrue(auth.verify_password("s3cret", "s3cret"))
+        self.assertFalse(auth.verify_password("wrong", "s3cret"))
+        self.assertTrue(auth.needs_rehash("s3cret"))
+
+    def test_non_ascii_password(self):
+        stored = auth.hash_password("pässwörd")
+        self.assertTrue(auth.verify_password("pässwörd", stored))
+        self.assertFalse(auth.verify_password("passwörd", "pässwörd"))
+
+
+class ChangePasswordTests(unittest.TestCase):
+    def setUp(self):
+        self.stored = auth.hash_password("old")
+        self.open_blocks = 0
+        self.kdf_calls_inside_block = 0
+        self.updates = []
+
+    def _fake_db_cursor(self, *args, **kwargs):
+        test = self
+
+        class Cursor:
+            rowcount = 0
+
+            def execute(self, query, params=()):
+                if query.startswith("UPDATE"):
+                    test.updates.append(params)
+                    self.rowcount = 1
+
+            def fetchone(self):
+                return (test.stored,)
+
+        @contextmanager
+        def block():
+            self.open_blocks += 1
+            try:
+                yield None, Cursor()
+            finally:
+                self.open_blocks -= 1
+
+        return block()
+
+    def _tracking(self, func):
+        def wrapper(*args):
+            if self.open_blocks:
+                self.kdf_calls_inside_block += 1
+            return func(*args)
+
+        return wrapper
+
+    def _change(self, old, new):
+        with mock.patch.object(auth, "db_cursor", self._fake_db_cursor), mock.patch.object(
+            auth, "verify_password", self._tracking(auth.verify_password)
+        ), mock.patch.object(auth, "hash_password", self._tracking(auth.hash_password)):
+            return auth.change_password(7, old, new)
+
+    def test_kdf_runs_outside_cursor_blocks(self):
+        self.assertTrue(self._change("old", "new"))
+        self.assertEqual(self.kdf_calls_inside_block, 0)
+        new_stored, userid, expected_old = self.updates[0]
+        self.assertEqual((userid, expected_old), (7, self.stored))
+        self.assertTrue(auth.verify_password("new", new_stored))
+
+    def test_wrong_old_password_does_not_update(self):
+        self.assertFalse(self._change("wrong", "new"))
+        self.assertEqual(self.updates, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
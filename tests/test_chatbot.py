@@ -38,12 +38,34 @@ class ParseAgentResponseTests(unittest.TestCase):
         parsed = chatbot.parse_agent_response(response)
         self.assertIsNone(parsed)
 
+    def test_missing_output_marker_returns_none(self):
+        response = "SQL: SELECT * FROM transaction;"
+        self.assertIsNone(chatbot.parse_agent_response(response))
+
+    def test_fenced_multiline_sql_after_preamble(self):
+        response = (
+            "Sure, here you go.\n"
+            "SQL: `SELECT name\nFROM category;`\n"
+            "Output: Lists category names.\nSQL: appears in the explanation only."
+        )
+        parsed = chatbot.parse_agent_response(response)
+        self.assertIsNotNone(parsed)
+        self.assertEqual(parsed.sql, "SELECT name\nFROM category;")
+        self.assertEqual(
+            parsed.explanation, "Lists category names.\nSQL: appears in the explanation only."
+        )
+
 
 class ExecuteSqlGuardsTests(unittest.TestCase):
     def test_drop_statement_rejected(self):
         with self.assertRaises(ValueError):
             chatbot.execute_sql("DROP TABLE user;")
 
+    def test_lowercase_delete_and_alter_rejected(self):
+        for sql in ("delete from transaction;", "alter table user drop column email;"):
+            with self.assertRaises(ValueError):
+                chatbot.execute_sql(sql)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from mysql.connector.errors import Error, OperationalError, PoolError
+
+from src import db
+
+
+class FakeConnection:
+    """Autocommit connection double that records the transaction commands it receives."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_transaction = False
+        self.fail_rollback = False
+
+    def cursor(self):
+        return mock.Mock()
+
+    def start_transaction(self):
+        self.calls.append("start_transaction")
+        self.in_transaction = True
+
+    def commit(self):
+        self.calls.append("commit")
+        self.in_transaction = False
+
+    def rollback(self):
+        self.calls.append("rollback")
+        if self.fail_rollback:
+            raise OperationalError("Lost connection to MySQL server during query")
+        self.in_transaction = False
+
+    def cmd_reset_connection(self):
+        self.calls.append("reset")
+        return True
+
+    def close(self):
+        self.calls.append("close")
+
+
+class DbCursorTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+        patcher = mock.patch.object(db, "get_connection", lambda config=None: self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_only_block_sends_no_transaction_commands(self):
+        with db.db_cursor() as (_, cursor):
+            cursor.execute("SELECT 1")
+        self.assertEqual(self.conn.calls, ["close"])
+
+    def test_commit_block_runs_in_an_explicit_transaction(self):
+        with db.db_cursor(commit=True):
+            pass
+        self.assertEqual(self.conn.calls, ["start_transaction", "commit", "close"])
+
+    def test_unfinished_transaction_is_rolled_back(self):
+        with self.assertRaises(ValueError):
+            with db.db_cursor(commit=True):
+                raise ValueError("bad row")
+        self.assertEqual(self.conn.calls, ["start_transaction", "rollback", "close"])
+
+    def test_database_error_resets_the_session(self):
+        with self.assertRaises(Error):
+            with db.db_cursor(commit=True):
+                raise Error("deadlock")
+        self.assertEqual(self.conn.calls, ["start_transaction", "reset", "close"])
+
+    def test_cleanup_failure_does_not_mask_the_original_error(self):
+        self.conn.fail_rollback = True
+        with mock.patch.object(db.logger, "warning") as warning:
+            with self.assertRaises(ValueError):
+                with db.db_cursor(commit=True):
+                    raise ValueError("bad row")
+        warning.assert_called_once()
+        self.assertEqual(self.conn.calls[-1], "close")
+
+    def test_cleanup_failure_after_success_is_raised(self):
+        self.conn.fail_rollback = True
+        with self.assertRaises(OperationalError):
+            with db.db_cursor() as (conn, _):
+                conn.in_transaction = True
+
+
+class GetConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.pool = mock.Mock(pool_name="spendwise-test")
+        for name, value in (("_get_pool", lambda config: self.pool), ("logger", mock.Mock())):
+            patcher = mock.patch.object(db, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_exhausted_pool_waits_for_a_returned_connection(self):
+        conn = object()
+        self.pool.get_connection.side_effect = [PoolError("exhausted")] * 2 + [conn]
+        with mock.patch.object(db.time, "sleep"):
+            self.assertIs(db.get_connection(), conn)
+        db.logger.warning.assert_called_once()
+
+    def test_exhausted_pool_times_out(self):
+        self.pool.get_connection.side_effect = PoolError("exhausted")
+        with mock.patch.object(db, "_POOL_TIMEOUT", 0.05), self.assertRaises(PoolError):
+            db.get_connection()
+        db.logger.error.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
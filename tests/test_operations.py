@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import sys
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+import unittest
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import operations
+
+
+class RecordingCursor:
+    """Cursor double that records executed statements and answers from ``results``."""
+
+    def __init__(self, results=None):
+        self.results = results or (lambda query, params: [])
+        self.executed = []
+        self.lastrowid = 1
+        self.column_names = ()
+        self._rows = []
+
+    def execute(self, query, params=()):
+        self.executed.append((query, list(params)))
+        self._rows = list(self.results(query, params))
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+def patch_db_cursor(cursor):
+    @contextmanager
+    def fake_db_cursor(*args, **kwargs):
+        yield None, cursor
+
+    return mock.patch.object(operations, "db_cursor", fake_db_cursor)
+
+
+class ViewUserSummaryTests(unittest.TestCase):
+    def setUp(self):
+        operations._SUMMARY_CACHE.clear()
+        self.version = 1
+        self.cursor = RecordingCursor(self._results)
+
+    def _results(self, query, params):
+        if query == operations.TRANSACTION_VERSION_SQL:
+            return [(self.version,)]
+        return [("Food", Decimal("5.00"))]
+
+    def _aggregate_runs(self):
+        return sum(query != operations.TRANSACTION_VERSION_SQL for query, _ in self.cursor.executed)
+
+    def test_summary_is_cached_while_version_is_unchanged(self):
+        with patch_db_cursor(self.cursor):
+            first = operations.view_user_summary(7)
+            second = operations.view_user_summary(7)
+        self.assertEqual(first, second)
+        self.assertEqual(first[0].total_amount, Decimal("5.00"))
+        self.assertEqual(self._aggregate_runs(), 1)
+
+    def test_version_change_recomputes_summary(self):
+        with patch_db_cursor(self.cursor):
+            operations.view_user_summary(7)
+            # An in-place UPDATE of an amount bumps the version without adding rows
+            self.version += 1
+            operations.view_user_summary(7)
+        self.assertEqual(self._aggregate_runs(), 2)
+
+    def test_user_without_version_row_is_version_zero(self):
+        cursor = RecordingCursor(lambda query, params: [])
+        self.assertEqual(operations.fetch_transaction_version(cursor, 7), 0)
+
+
+def transaction_row(amount, paymentmethod=3):
+    return (7, 1, amount, "expense", date(2024, 3, 2), paymentmethod)
+
+
+class InsertTransactionsTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = RecordingCursor()
+
+    def test_placeholders_match_params(self):
+        rows = [transaction_row(Decimal(i)) for i in range(3)]
+        operations._insert_transactions(self.cursor, rows)
+        (query, params), = self.cursor.executed
+        self.assertEqual(query.count("%s"), len(params))
+        self.assertEqual(query.count("(%s, %s, %s, %s, %s, %s)"), 3)
+        self.assertEqual(params[:6], [7, 1, Decimal(0), "expense", date(2024, 3, 2), 3])
+
+    def test_rows_are_batched_by_500(self):
+        rows = [transaction_row(Decimal(i)) for i in range(1001)]
+        operations._insert_transactions(self.cursor, rows)
+        self.assertEqual(len(self.cursor.executed), 3)
+        self.assertEqual([len(params) // 6 for _, params in self.cursor.executed], [500, 500, 1])
+        for query, params in self.cursor.executed:
+            self.assertEqual(query.count("%s"), len(params))
+        # Every row is sent exactly once, in order
+        amounts = [
+            params[i] for _, params in self.cursor.executed for i in range(2, len(params), 6)
+        ]
+        self.assertEqual(amounts, [Decimal(i) for i in range(1001)])
+
+    def test_float_amounts_are_sent_as_decimal(self):
+        operations._insert_transactions(self.cursor, [transaction_row(0.1)])
+        self.assertEqual(self.cursor.executed[0][1][2], Decimal("0.1"))
+
+    def test_rows_without_payment_method_omit_the_column(self):
+        rows = [transaction_row(1, None), transaction_row(2), transaction_row(3, None)]
+        operations._insert_transactions(self.cursor, rows)
+        (five_query, five_params), (six_query, six_params) = self.cursor.executed
+        # The 5-column INSERT leaves paymentmethod to its NULL column default
+        self.assertIn("(userid, categoryid, amount, type, date)", five_query)
+        self.assertNotIn("paymentmethod", five_query)
+        self.assertEqual(five_query.count("(%s, %s, %s, %s, %s)"), 2)
+        self.assertEqual(five_query.count("%s"), len(five_params))
+        self.assertEqual(five_params[2::5], [Decimal(1), Decimal(3)])
+        self.assertIn("paymentmethod", six_query)
+        self.assertEqual(six_params, [7, 1, Decimal(2), "expense", date(2024, 3, 2), 3])
+
+    def test_single_row_without_payment_method_uses_one_statement(self):
+        operations._insert_transactions(self.cursor, [transaction_row(1, None)])
+        (query, params), = self.cursor.executed
+        self.assertNotIn("paymentmethod", query)
+        self.assertEqual(len(params), 5)
+
+    def test_record_transactions_returns_row_count(self):
+        with patch_db_cursor(self.cursor):
+            self.assertEqual(operations.record_transactions([transaction_row(1)] * 3), 3)
+            self.assertEqual(operations.record_transactions([]), 0)
+        self.assertEqual(len(self.cursor.executed), 1)
+
+
+class UpdateBudgetsTests(unittest.TestCase):
+    def setUp(self):
+        self.cursor = RecordingCursor()
+
+    def test_case_branches_and_in_list_line_up_with_params(self):
+        rows = [(1, Decimal("100"), "active"), (2, 250.5, "inactive"), (3, Decimal("0"), "active")]
+        operations._update_budgets(self.cursor, rows)
+        (query, params), = self.cursor.executed
+        limit_cases, status_cases = (
+            part.split("END")[0] for part in query.split("CASE budgetid")[1:]
+        )
+        in_list = query.split("IN (")[1].split(")")[0]
+        self.assertEqual(limit_cases.count("WHEN %s THEN %s"), 3)
+        self.assertEqual(status_cases.count("WHEN %s THEN %s"), 3)
+        self.assertEqual(in_list.count("%s"), 3)
+        self.assertEqual(query.count("%s"), len(params))
+        self.assertEqual(
+            params,
+            [1, Decimal("100"), 2, Decimal("250.5"), 3, Decimal("0"),
+             1, "active", 2, "inactive", 3, "active",
+             1, 2, 3],
+        )
+
+    def test_single_budget_update(self):
+        with patch_db_cursor(self.cursor):
+            operations.update_budget(9, Decimal("50"), "active")
+        (query, params), = self.cursor.executed
+        self.assertEqual(query.count("%s"), len(params))
+        self.assertEqual(params, [9, Decimal("50"), 9, "active", 9])
+
+    def test_empty_input_issues_no_statement(self):
+        with patch_db_cursor(self.cursor):
+            self.assertEqual(operations.update_budgets([]), 0)
+        self.assertEqual(self.cursor.executed, [])
+
+    def test_budgets_are_batched_by_500(self):
+        operations._update_budgets(self.cursor, [(i, Decimal(i), "active") for i in range(501)])
+        self.assertEqual([len(params) // 5 for _, params in self.cursor.executed], [500, 1])
+
+
+class RecordTransactionWithStatusTests(unittest.TestCase):
+    def setUp(self):
+        operations._COLUMN_NAMES.clear()
+        self.cursor = RecordingCursor(self._results)
+
+    def _results(self, query, params):
+        if query == operations._BUDGET_STATUS_SQL:
+            return [(7, 1, 12, "OK")]
+        if "JSON_ARRAYAGG" in query:
+            return [('[{"alertid": 4, "message": "warn"}]',)]
+        return []
+
+    def test_budget_status_uses_the_transaction_month_and_year(self):
+        self.cursor.column_names = ("userid", "categoryid", "month", "alert_level")
+        with patch_db_cursor(self.cursor):
+            transid, status, alerts = operations.record_transaction_with_status(
+                7, 1, Decimal("5"), "expense", date(2023, 12, 31)
+            )
+        statements = dict(self.cursor.executed[1:])
+        self.assertEqual(statements[operations._BUDGET_STATUS_SQL], [7, 1, 12, 2023])
+        self.assertEqual(status["alert_level"], "OK")
+        self.assertEqual(alerts, [{"alertid": 4, "message": "warn"}])
+
+    def test_alert_limit_is_bound_and_clamped(self):
+        with patch_db_cursor(self.cursor):
+            operations.get_user_alerts(7, limit=3)
+            operations.get_user_alerts(7, limit=10_000)
+            operations.get_user_alerts(7, limit=0)
+        self.assertEqual(
+            [params for _, params in self.cursor.executed], [[7, 3], [7, 100], [7, 1]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()